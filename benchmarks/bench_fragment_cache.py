@@ -0,0 +1,70 @@
+"""
+Measure Model.get_json_database with the per-entity json fragments uncached, unchanged, and after a small batch
+of results or referee changes.
+Usage: python -m benchmarks.bench_fragment_cache [scale ...]
+"""
+import pickle
+import sys
+import time
+
+from lib.model.game_result import GameResult
+from tests.support.synthetic import create_model, create_results
+
+
+def measure(prepare, model_function, repeat=10):
+    """
+    Time get_json_database on the model that model_function returns after calling prepare, which is not timed
+    """
+    best = None
+    for _ in range(repeat):
+        prepare()
+        model = model_function()
+        start = time.perf_counter()
+        model.get_json_database()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e3
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:>12} {3:>12} {4:>16} {5:>16}".format(
+        "scale", "games", "cold (ms)", "warm (ms)", "10 results (ms)", "10 referees (ms)"))
+    for scale in scales:
+        model = create_model(scale)
+        all_results = create_results(model, 0.5)
+        model.apply_new_game_results(all_results)
+        cold_model = pickle.dumps(model, pickle.HIGHEST_PROTOCOL)
+        holder = []
+
+        cold = measure(lambda: holder.insert(0, pickle.loads(cold_model)), lambda: holder[0])
+
+        model.get_json_database()
+        warm = measure(lambda: None, lambda: model)
+
+        games = sorted(model.games, key=lambda g: (g.datetime, g.pitch.rank))
+        batches = iter(range(len(games) // 2, len(games), 10))
+
+        def apply_results():
+            # the results are always applied as a whole, as read from the workbook
+            first = next(batches)
+            all_results.update({game.name: GameResult(1, 0) for game in games[first:first + 10]})
+            model.apply_new_game_results(all_results)
+
+        results = measure(apply_results, lambda: model)
+
+        referee_batches = iter(range(0, len(games), 10))
+
+        def apply_referees():
+            first = next(referee_batches)
+            referee = model.referees[first % len(model.referees)]
+            model.apply_referees_and_juries({game.name: {"referees": referee.get_first_name(), "jury": ""}
+                                             for game in games[first:first + 10]})
+
+        referee_changes = measure(apply_referees, lambda: model)
+
+        print("{0:>6} {1:>7} {2:>12.2f} {3:>12.2f} {4:>16.2f} {5:>16.2f}".format(
+            scale, len(model.games), cold, warm, results, referee_changes))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100])
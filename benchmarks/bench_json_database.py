@@ -0,0 +1,66 @@
+"""
+Compare Model.get_json_database with the former str.format based implementation.
+Usage: python -m benchmarks.bench_json_database [scale ...]
+"""
+import sys
+import timeit
+
+from tests.support.synthetic import create_model, create_results
+
+
+def legacy_game_to_json(game, pool):
+    pool_id = pool.id if game not in pool.finals else -1
+
+    return "{{\"id\": {0}, \"field\": {1}, \"date\": \"{2}\", \"pool\": {3}, \"poolAbbreviation\": \"{4}\", " \
+           "\"homeTeam\": {5}, \"homeTeamName\": \"{6}\", \"awayTeam\": {7}, \"awayTeamName\": \"{8}\", " \
+           "\"referee1\": {9}, \"referee1Name\": \"{10}\", \"referee2\": {11}, \"referee2Name\": \"{12}\"}}".format(
+               game.id, game.pitch.id, game.datetime.strftime("%d-%m-%Y %H:%M:%S"), pool_id, pool.abbreviation,
+               game.home_team.id if game.home_team else -1, game.get_home_team_name(),
+               game.away_team.id if game.away_team else -1, game.get_away_team_name(),
+               game.referee1.id if game.referee1 else -1, game.referee1.name if game.referee1 else "",
+               game.referee2.id if game.referee2 else -1, game.referee2.name if game.referee2 else "")
+
+
+def legacy_json_database(model):
+    """
+    The database as it was built before: fresh reverse indexes, str.format without escaping and joins
+    """
+    category_by_pool = {pool: category
+                        for category in model.categories
+                        for main_pool in category.pools
+                        for pool in (main_pool.sub_pools if main_pool.sub_pools else [main_pool])}
+    pool_by_game = {game: pool
+                    for pool in model.all_pools
+                    for game in pool.own_games}
+
+    return "\"categories\": [{0}], \"pools\": [{1}],\"teams\": [{2}], \"fields\": [{3}],\"referees\": [{4}]," \
+           "\"games\": [{5}]".format(
+               ",".join("{{\"id\": {0}, \"name\": \"{1}\", \"rank\": {2}}}".format(c.id, c.name, c.rank)
+                        for c in model.categories),
+               ",".join("{{\"id\": {0}, \"name\": \"{1}\", \"abbreviation\": \"{2}\", \"category\": {3}, "
+                        "\"rank\": {4}}}".format(p.id, p.name, p.abbreviation, category_by_pool[p].id, p.rank)
+                        for p in model.relevant_pools),
+               ",".join("{{\"id\": {0}, \"name\": \"{1}\"}}".format(t.id, t.name) for t in model.teams),
+               ",".join("{{\"id\": {0}, \"name\": \"{1}\", \"rank\": {2}}}".format(p.id, p.name, p.rank)
+                        for p in model.pitches),
+               ",".join("{{\"id\": {0}, \"name\": \"{1}\"}}".format(r.id, r.name) for r in model.referees),
+               ",".join(legacy_game_to_json(g, pool_by_game[g]) for g in model.games))
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:>12} {3:>12} {4:>12}".format("scale", "games", "former (ms)", "writer (ms)", "size (kB)"))
+    for scale in scales:
+        model = create_model(scale)
+        model.apply_new_game_results(create_results(model, 0.7))
+        assert legacy_json_database(model) == model.get_json_database()
+
+        number = max(1, 200 // scale)
+        former = min(timeit.repeat(lambda: legacy_json_database(model), number=number, repeat=5)) / number
+        writer = min(timeit.repeat(model.get_json_database, number=number, repeat=5)) / number
+
+        print("{0:>6} {1:>7} {2:>12.2f} {3:>12.2f} {4:>12.1f}".format(
+            scale, len(model.games), former * 1e3, writer * 1e3, len(model.get_json_database()) / 1024.0))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100])
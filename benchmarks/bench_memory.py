@@ -0,0 +1,174 @@
+"""
+Report the memory used per model object, the memory of a complete model and the size of its snapshot, for the slotted
+model entities and for the former entities that kept their attributes in an instance dict and their observers in a
+list. The former model is rebuilt from the current one by pickling its entities as plain objects with the same
+attributes.
+Usage: python -m benchmarks.bench_memory [scale ...]
+"""
+import gc
+import io
+import pickle
+import sys
+import tracemalloc
+
+from lib.model.category import Category
+from lib.model.game import Game, RankGame, ResultGame
+from lib.model.game_result import GameResult
+from lib.model.pitch import Pitch
+from lib.model.referee import Referee
+from lib.model.sponsor import Sponsor
+from lib.model.team import Team
+from lib.model.template_game import TemplateGame
+from tests.support.synthetic import create_model, create_results
+
+
+class LegacyGame:
+    pass
+
+
+class LegacyRankGame:
+    pass
+
+
+class LegacyResultGame:
+    pass
+
+
+class LegacyTeam:
+    pass
+
+
+class LegacyReferee:
+    pass
+
+
+class LegacyPitch:
+    pass
+
+
+class LegacyCategory:
+    pass
+
+
+class LegacySponsor:
+    pass
+
+
+class LegacyGameResult:
+    pass
+
+
+class LegacyTemplateGame:
+    pass
+
+
+# one former class per entity class, so that their instance dicts share keys as they did
+LEGACY_CLASSES = {Game: LegacyGame, RankGame: LegacyRankGame, ResultGame: LegacyResultGame, Team: LegacyTeam,
+                  Referee: LegacyReferee, Pitch: LegacyPitch, Category: LegacyCategory, Sponsor: LegacySponsor,
+                  GameResult: LegacyGameResult, TemplateGame: LegacyTemplateGame}
+
+
+def get_slot_names(cls):
+    """
+    The attribute names of the slots of a class and its bases, with private names mangled
+    @rtype: list[str]
+    """
+    return [name if not name.startswith("__") else "_{0}{1}".format(base.__name__.lstrip("_"), name)
+            for base in reversed(cls.__mro__) for name in base.__dict__.get("__slots__", ())]
+
+
+class LegacyPickler(pickle.Pickler):
+    """
+    Pickles the model entities as the former classes with an instance dict; everything else as it is
+    """
+
+    def reducer_override(self, obj):
+        legacy_class = LEGACY_CLASSES.get(type(obj))
+        if legacy_class is None:
+            return NotImplemented
+
+        state = {name: getattr(obj, name) for name in get_slot_names(type(obj)) if hasattr(obj, name)}
+        if "observers" in state:
+            state["observers"] = list(state["observers"])
+        return legacy_class, (), state
+
+
+def dumps_legacy(obj):
+    """
+    @rtype: bytes
+    """
+    output_file = io.BytesIO()
+    LegacyPickler(output_file, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return output_file.getvalue()
+
+
+def object_size(obj):
+    """
+    Size of the object itself plus its instance dict and observer list, if any
+    @rtype: int
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    if hasattr(obj, "observers"):
+        size += sys.getsizeof(obj.observers)
+    return size
+
+
+def report_objects(model):
+    samples = [
+        ("Game", next(g for g in model.games if type(g) is Game)),
+        ("RankGame", next(g for g in model.games if type(g) is RankGame)),
+        ("ResultGame", next(g for g in model.games if type(g) is ResultGame)),
+        ("Team", model.teams[0]),
+        ("Referee", model.referees[0]),
+        ("Pitch", model.pitches[0]),
+        ("Category", model.categories[0]),
+        ("Sponsor", model.sponsors[0]),
+        ("GameResult", next(g.result for g in model.games if g.result)),
+        ("TemplateGame", TemplateGame(0, model.pitches[0], model.games[0].datetime, model.pools[0])),
+    ]
+    legacy_samples = pickle.loads(dumps_legacy([obj for _, obj in samples]))
+
+    print("{0:<14} {1:>12} {2:>12}".format("class", "__dict__ (B)", "slots (B)"))
+    for (name, obj), legacy_obj in zip(samples, legacy_samples):
+        print("{0:<14} {1:>12} {2:>12}".format(name, object_size(legacy_obj), object_size(obj)))
+
+
+def measure_load(snapshot):
+    """
+    The memory taken by the model loaded from a snapshot
+    @rtype: int
+    """
+    gc.collect()
+    tracemalloc.start()
+    model = pickle.loads(snapshot)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+    return memory
+
+
+def report_model(scale):
+    model = create_model(scale)
+    model.apply_new_game_results(create_results(model, 0.7))
+
+    snapshot = pickle.dumps(model, pickle.HIGHEST_PROTOCOL)
+    legacy_snapshot = dumps_legacy(model)
+    for name, data in (("__dict__", legacy_snapshot), ("slots", snapshot)):
+        print("{0:>6} {1:>7} {2:<9} {3:>12.1f} {4:>14.1f}".format(scale, len(model.games), name,
+                                                                  measure_load(data) / 1024.0, len(data) / 1024.0))
+    return model
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:<9} {3:>12} {4:>14}".format("scale", "games", "entities", "memory (kB)",
+                                                        "model.bin (kB)"))
+    models = [report_model(scale) for scale in scales]
+    print("")
+    report_objects(models[-1])
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100])
@@ -0,0 +1,42 @@
+"""
+Compare the cached collection views of Model with rebuilding them on every access.
+Usage: python -m benchmarks.bench_model_views [scale ...]
+"""
+import sys
+import timeit
+
+from tests.support.synthetic import create_model
+
+
+def rebuild_views(model):
+    """
+    The views as they were computed before caching: fresh lists on every access
+    """
+    pools = [pool for category in model.categories for pool in category.pools]
+    all_pools = [pool for main_pool in pools for pool in [main_pool] + main_pool.sub_pools]
+    relevant_pools = [pool for main_pool in pools for pool in (main_pool.sub_pools or [main_pool])]
+    teams = [team for pool in pools for team in pool.teams + list(t for sp in pool.sub_pools for t in sp.teams)]
+    games = [game for game in model.game_schedule.games]
+    return pools, all_pools, relevant_pools, teams, games
+
+
+def cached_views(model):
+    return model.pools, model.all_pools, model.relevant_pools, model.teams, model.games
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:>14} {3:>14} {4:>8}".format("scale", "games", "rebuild (us)", "cached (us)", "speedup"))
+    for scale in scales:
+        model = create_model(scale)
+        assert tuple(map(list, cached_views(model))) == tuple(map(list, rebuild_views(model)))
+
+        number = max(10, 20000 // scale)
+        rebuild = min(timeit.repeat(lambda: rebuild_views(model), number=number, repeat=5)) / number
+        cached = min(timeit.repeat(lambda: cached_views(model), number=number, repeat=5)) / number
+
+        print("{0:>6} {1:>7} {2:>14.2f} {3:>14.2f} {4:>7.0f}x".format(
+            scale, len(model.games), rebuild * 1e6, cached * 1e6, rebuild / cached))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
@@ -0,0 +1,56 @@
+"""
+Compare storing and loading snapshots through PersistenceHandler with the former plain pickle of the model.
+Usage: python -m benchmarks.bench_persistence [scale ...]
+"""
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import timeit
+
+from lib.logic.persistence_handler import PersistenceHandler
+from tests.support.synthetic import create_model, create_results
+
+
+def legacy_store(model, file_name):
+    with open(file_name, "wb") as output_file:
+        pickle.dump(model, output_file)
+
+
+def legacy_load(file_name):
+    with open(file_name, "rb") as input_file:
+        return pickle.load(input_file)
+
+
+def measure(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e3
+
+
+def main(scales):
+    folder = tempfile.mkdtemp()
+    try:
+        print("{0:>6} {1:<18} {2:>10} {3:>10} {4:>10}".format("scale", "format", "store (ms)", "load (ms)", "size (kB)"))
+        for scale in scales:
+            model = create_model(scale)
+            model.apply_new_game_results(create_results(model, 0.7))
+
+            legacy_file_name = os.path.join(folder, "legacy.bin")
+            store = measure(lambda: legacy_store(model, legacy_file_name))
+            load = measure(lambda: legacy_load(legacy_file_name))
+            print("{0:>6} {1:<18} {2:>10.2f} {3:>10.2f} {4:>10.1f}".format(
+                scale, "plain pickle", store, load, os.path.getsize(legacy_file_name) / 1024.0))
+
+            for compress in (False, True):
+                handler = PersistenceHandler(folder, compress=compress)
+                store = measure(lambda: handler.store_model(model))
+                load = measure(handler.load_model)
+                print("{0:>6} {1:<18} {2:>10.2f} {3:>10.2f} {4:>10.1f}".format(
+                    scale, "snapshot" + (" + zlib" if compress else ""), store, load,
+                    os.path.getsize(os.path.join(folder, "model.bin")) / 1024.0))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10])
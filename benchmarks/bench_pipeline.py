@@ -0,0 +1,137 @@
+"""
+Time every stage of handle_results, from reading the results in the workbook to storing them, over many runs,
+against the in-memory stand-in of the workbook and the local stand-in of the app server with some latency.
+Every run, the result desk first enters the scores of the next few games, in the order in which they are played.
+Usage: python -m benchmarks.bench_pipeline [scale ...]
+"""
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from lib.excel_interop.excel_reader import ExcelReader
+from lib.excel_interop.excel_writer import ExcelWriter
+from lib.logic.persistence_handler import PersistenceHandler
+from lib.server.local_server import LocalServer
+from lib.server.upload_handler import UploadHandler
+from tests.support.fake_workbook import FakeBook, find_column
+from tests.support.synthetic import create_model
+
+# the password the local stand-in of the app server is started with; the real one is not part of the repository
+PASSWORD = "benchmark"
+
+STAGES = ["load model", "read results", "apply results", "upload results", "reprint", "upload database",
+          "store results", "total"]
+
+PRINTABLE_SHEETS = ["Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+def timed(timings, stage, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    timings[stage].append(time.perf_counter() - start)
+    return result
+
+
+def get_rows_in_playing_order(workbook, model):
+    """
+    Get the sheet and row of every game on the printable sheets, in the order in which the games are played
+    @rtype: list[tuple[FakeSheet, int]]
+    """
+    row_by_name = {}
+    for sheet_name in PRINTABLE_SHEETS:
+        sheet = workbook.sheets(sheet_name)
+        id_column = find_column(sheet, "Id")
+        row_by_name.update({value: (sheet, row) for (row, column), value in sheet.cells.items()
+                            if column == id_column and row > 1})
+
+    games = sorted(model.games, key=lambda g: (g.datetime, g.pitch.rank))
+    return [row_by_name[game.name] for game in games]
+
+
+def handle_results(workbook, folder, url, timings):
+    """
+    The steps of main.handle_results, with a synchronous upload to the given url
+    @rtype: int
+    """
+    start = time.perf_counter()
+
+    persistence_handler = PersistenceHandler(folder)
+    upload_handler = UploadHandler(folder, url, password=PASSWORD)
+    reader = ExcelReader(workbook)
+
+    model = timed(timings, "load model", persistence_handler.load_model)
+    fingerprints = persistence_handler.load_fingerprints(workbook.fullname)
+    known_results = {game.name: game.result for game in model.games if game.result}
+    changed_game_results, fingerprints["results"] = timed(timings, "read results", reader.load_changed_results,
+                                                          fingerprints.get("results", {}), known_results)
+    changes = timed(timings, "apply results", model.apply_new_game_results, changed_game_results, True)
+    timed(timings, "upload results", upload_handler.upload_results, changes.new_results)
+
+    if changes.schedule_has_changed:
+        written_sheets = persistence_handler.load_written_sheets(workbook.fullname)
+        timed(timings, "reprint", ExcelWriter(workbook, written_sheets).write_printable_game_schedule,
+              model.game_schedule, model.pool_by_game, False)
+        persistence_handler.store_written_sheets(workbook.fullname, written_sheets)
+        timed(timings, "upload database", upload_handler.upload_database, model)
+
+    timed(timings, "store results", persistence_handler.store_results, model, changes.new_results)
+    persistence_handler.store_fingerprints(workbook.fullname, fingerprints)
+
+    timings["total"].append(time.perf_counter() - start)
+    return len(changed_game_results)
+
+
+def main(scales, runs=40, results_per_run=10, latency=0.02):
+    server = LocalServer(PASSWORD).start()
+    server.latency = latency
+
+    try:
+        for scale in scales:
+            folder = tempfile.mkdtemp()
+            try:
+                model = create_model(scale)
+                workbook = FakeBook()
+                written_sheets = {}
+                ExcelWriter(workbook, written_sheets).write_printable_game_schedule(model.game_schedule,
+                                                                                    model.pool_by_game)
+                PersistenceHandler(folder).store_model(model)
+                PersistenceHandler(folder).store_written_sheets(workbook.fullname, written_sheets)
+
+                rows = get_rows_in_playing_order(workbook, model)
+                generator = random.Random(scale)
+                timings = {stage: [] for stage in STAGES}
+                entered = read = calls = cells = 0
+
+                for run in range(min(runs, len(rows) // results_per_run)):
+                    for sheet, row in rows[run * results_per_run:(run + 1) * results_per_run]:
+                        sheet.cells[(row, find_column(sheet, "DW"))] = generator.randint(0, 5)
+                        sheet.cells[(row, find_column(sheet, "DB"))] = generator.randint(0, 5)
+                    entered += results_per_run
+
+                    workbook.reset_counters()
+                    read += handle_results(workbook, folder, server.url, timings)
+                    calls += workbook.calls
+                    cells += workbook.cells_read + workbook.cells_written
+            finally:
+                shutil.rmtree(folder)
+
+            print("scale {0}: {1} games, {2} runs of {3} new results, {4:.0f} ms latency; "
+                  "{5} of {6} entered results handed on once; {7:.0f} workbook calls and {8:.0f} cells per run".format(
+                      scale, len(model.games), len(timings["total"]), results_per_run, latency * 1e3,
+                      read, entered, calls / float(len(timings["total"])), cells / float(len(timings["total"]))))
+            print("{0:>16} {1:>6} {2:>10} {3:>10} {4:>10}".format("stage", "runs", "mean (ms)", "p90 (ms)", "max (ms)"))
+            for stage in STAGES:
+                values = sorted(timings[stage])
+                if values:
+                    print("{0:>16} {1:>6} {2:>10.2f} {3:>10.2f} {4:>10.2f}".format(
+                        stage, len(values), sum(values) / len(values) * 1e3,
+                        values[int(len(values) * 0.9)] * 1e3, values[-1] * 1e3))
+            print()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10])
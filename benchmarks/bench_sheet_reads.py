@@ -0,0 +1,64 @@
+"""
+Compare reading the printable schedule sheets through ExcelBase._load_sheet with the former read of the fixed block
+A1:CZ100, against the in-memory stand-in of the workbook that counts the calls and cells moved.
+Usage: python -m benchmarks.bench_sheet_reads [scale ...]
+"""
+import sys
+import timeit
+
+from lib.excel_interop.excel_base import ExcelBase
+from lib.excel_interop.excel_writer import ExcelWriter
+from tests.support.fake_workbook import FakeBook
+from tests.support.synthetic import create_model
+
+PRINTABLE_SHEETS = ["Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+def legacy_load_sheet(sheet):
+    result = []
+
+    values = sheet.range("A1:CZ100").value
+    values = [list(i) for i in zip(*values)]  # transpose
+    useful_columns = [column for column in values if column[0] is not None]
+    for useful_column in useful_columns:
+        # fetch all data in the column until the first non-empty cell
+        for i, value in enumerate(reversed(useful_column)):
+            if value is not None:
+                result.append((useful_column[0], useful_column[1:-i]))
+                break
+
+    return result
+
+
+def measure(workbook, load_sheet):
+    """
+    @rtype: tuple[float, int, int, int]
+    """
+    sheets = [workbook.sheets(name) for name in PRINTABLE_SHEETS]
+
+    workbook.reset_counters()
+    games = sum(len(dict(load_sheet(sheet)).get("Id", [])) for sheet in sheets)
+    calls, cells = workbook.calls, workbook.cells_read
+
+    elapsed = min(timeit.repeat(lambda: [load_sheet(sheet) for sheet in sheets], number=5, repeat=3)) / 5
+    return elapsed * 1e3, calls, cells, games
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10} {7:>10} {8:>10} {9:>10}".format(
+        "scale", "games", "former ms", "calls", "cells", "games read", "bounded ms", "calls", "cells", "games read"))
+    for scale in scales:
+        model = create_model(scale)
+        workbook = FakeBook()
+        ExcelWriter(workbook).write_printable_game_schedule(model.game_schedule, model.pool_by_game)
+
+        former = measure(workbook, legacy_load_sheet)
+        bounded = measure(workbook, ExcelBase._load_sheet)
+        assert bounded[3] == len(model.games)
+
+        print("{0:>6} {1:>7} {2:>10.2f} {3:>10} {4:>10} {5:>10} {6:>10.2f} {7:>10} {8:>10} {9:>10}".format(
+            scale, len(model.games), *(former + bounded)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
@@ -0,0 +1,119 @@
+"""
+Compare writing the printable schedule sheets through ExcelBase._write_sheet with the former write that colored every
+row on its own and always fitted the columns, against the in-memory stand-in of the workbook that counts the calls.
+Then compare reprinting the sheets in full with writing only the changes, after the second half of the results came in.
+Usage: python -m benchmarks.bench_sheet_writes [scale ...]
+"""
+import sys
+import timeit
+
+from lib.excel_interop.excel_writer import ExcelWriter
+from tests.support.fake_workbook import FakeBook
+from tests.support.synthetic import create_model, create_results
+
+PRINTABLE_SHEETS = ["Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+def excel_style(row, col):
+    col += 1
+    result = []
+    while col:
+        col, rem = divmod(col - 1, 26)
+        result[:0] = chr(rem + ord('A'))
+    return ''.join(result) + str(row + 1)
+
+
+class LegacyExcelWriter(ExcelWriter):
+    def _write_sheet(self, sheet, matrix, start_row=0, start_column=0, row_colors=[], autofit=True,
+                     key_column=None):
+        row_lens = set(len(row) for row in matrix)
+        if len(row_lens) != 1:
+            raise Exception("Only rectangular matrices are supported")
+        sheet.clear()
+        sheet.range(excel_style(start_row, start_column)).value = matrix
+
+        if row_colors:
+            row_len = next(iter(row_lens))
+            for i, color in enumerate(row_colors):
+                color_range = "{0}:{1}".format(excel_style(start_row + i, start_column),
+                                               excel_style(start_row + i, start_column + row_len - 1))
+                sheet.range(color_range).color = color
+
+        sheet.autofit("columns")
+
+
+def measure(writer_class, model, autofit):
+    """
+    @rtype: tuple[float, int, FakeBook]
+    """
+    workbook = FakeBook()
+    write = lambda: writer_class(workbook).write_printable_game_schedule(model.game_schedule, model.pool_by_game,
+                                                                          autofit)
+    write()
+    workbook.reset_counters()
+    write()
+    calls = workbook.calls
+
+    elapsed = min(timeit.repeat(write, number=5, repeat=3)) / 5
+    return elapsed * 1e3, calls, workbook
+
+
+def measure_reprints(scale, written_sheets, batches=20, results_per_batch=10):
+    """
+    Print the sheets when half of the games were played, then reprint them after every batch of new results
+    @rtype: tuple[float, float, FakeBook, int]
+    """
+    model = create_model(scale)
+    results = create_results(model, 1.0)
+    names = [game.name for game in sorted(model.games, key=lambda g: (g.datetime, g.pitch.rank))]
+    played = len(names) // 2
+    model.apply_new_game_results({name: results[name] for name in names[:played]})
+
+    workbook = FakeBook()
+    ExcelWriter(workbook, written_sheets).write_printable_game_schedule(model.game_schedule, model.pool_by_game)
+    workbook.reset_counters()
+
+    batches = min(batches, (len(names) - played) // results_per_batch)
+    for batch in range(batches):
+        played += results_per_batch
+        model.apply_new_game_results({name: results[name] for name in names[:played]})
+        ExcelWriter(workbook, written_sheets).write_printable_game_schedule(model.game_schedule, model.pool_by_game,
+                                                                            False)
+    return workbook.calls / float(batches), workbook.cells_written / float(batches), workbook, len(names)
+
+
+def main(scales):
+    print("{0:>6} {1:>7} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10} {7:>10}".format(
+        "scale", "games", "former ms", "calls", "grouped ms", "calls", "no fit ms", "calls"))
+    for scale in scales:
+        model = create_model(scale)
+
+        former = measure(LegacyExcelWriter, model, True)
+        grouped = measure(ExcelWriter, model, True)
+        no_fit = measure(ExcelWriter, model, False)
+        for name in PRINTABLE_SHEETS:
+            former_sheet, grouped_sheet = former[2].sheets(name), grouped[2].sheets(name)
+            assert former_sheet.get_matrix() == grouped_sheet.get_matrix()
+            assert {cell: color for cell, color in former_sheet.colors.items() if color} == grouped_sheet.colors
+
+        print("{0:>6} {1:>7} {2:>10.2f} {3:>10} {4:>10.2f} {5:>10} {6:>10.2f} {7:>10}".format(
+            scale, len(model.games), *(former[:2] + grouped[:2] + no_fit[:2])))
+
+    print()
+    print("reprints after every 10 new results, per reprint:")
+    print("{0:>6} {1:>7} {2:>12} {3:>12} {4:>12} {5:>12}".format(
+        "scale", "games", "full calls", "cells", "diff calls", "cells"))
+    for scale in scales:
+        full = measure_reprints(scale, None)
+        diff = measure_reprints(scale, {})
+        for name in PRINTABLE_SHEETS:
+            full_sheet, diff_sheet = full[2].sheets(name), diff[2].sheets(name)
+            assert full_sheet.get_matrix() == diff_sheet.get_matrix()
+            assert full_sheet.colors == {cell: color for cell, color in diff_sheet.colors.items() if color}
+
+        print("{0:>6} {1:>7} {2:>12.1f} {3:>12.1f} {4:>12.1f} {5:>12.1f}".format(
+            scale, full[3], *(full[:2] + diff[:2])))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
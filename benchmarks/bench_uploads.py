@@ -0,0 +1,103 @@
+"""
+Compare uploads over a new connection per post, as before, with the shared session of UploadHandler, against the
+local stand-in of the app server with injected latency; then check that injected transient failures are retried.
+Then compare plain and compressed database uploads, with the sizes and timings from the metrics log.
+Finally compare sending the results, database and sponsors one after the other with sending them concurrently.
+Usage: python -m benchmarks.bench_uploads [latency in ms ...]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import requests
+
+from lib.server.local_server import LocalServer
+from lib.server.upload_handler import UploadHandler
+from tests.support.synthetic import create_model, create_results
+
+# the password the local stand-in of the app server is started with; the real one is not part of the repository
+PASSWORD = "benchmark"
+
+
+def legacy_upload(url, data):
+    r = requests.post(url, data)
+    if r.status_code // 100 != 2:
+        raise Exception("Upload failed! Error code {0}. Response: {1}".format(r.status_code, r.text))
+
+
+def measure(server, function, number=20):
+    connections = server.connections
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return (time.perf_counter() - start) / number * 1e3, server.connections - connections
+
+
+def main(latencies):
+    server = LocalServer(PASSWORD).start()
+    model = create_model(10)
+    results = model.apply_new_game_results(create_results(model, 0.3)).new_results
+    handler = UploadHandler(url=server.url, backoff=0.01, password=PASSWORD)
+
+    try:
+        print("{0:>12} {1:>12} {2:>12} {3:>12} {4:>12}".format(
+            "latency (ms)", "former (ms)", "connections", "session (ms)", "connections"))
+        for latency in latencies:
+            server.latency = latency / 1e3
+            data = {"type": "results", "password": PASSWORD,
+                    "data": ",".join("{{\"gameId\": {0}, \"homeScore\": {1}, \"awayScore\": {2}}}".format(
+                        identifier, result.home_score, result.away_score) for identifier, result in results.items())}
+            former, former_connections = measure(server, lambda: legacy_upload(server.url, data))
+            session, session_connections = measure(server, lambda: handler.upload_results(results))
+            print("{0:>12} {1:>12.2f} {2:>12} {3:>12.2f} {4:>12}".format(
+                latency, former, former_connections, session, session_connections))
+
+        server.latency = 0.0
+        server.failures = 2
+        handler.upload_results(results)
+        assert server.failures == 0 and len(server.results) == len(results)
+        print("two injected failures retried; {0} results uploaded".format(len(server.results)))
+
+        print()
+        print("{0:>6} {1:>10} {2:>12} {3:>12} {4:>12} {5:>12}".format(
+            "scale", "size (kB)", "plain (ms)", "gzip (kB)", "gzip (ms)", "ratio"))
+        for scale in (10, 100):
+            json_database = create_model(scale).get_json_database()
+            metrics = {}
+            for compress in (False, True):
+                folder = tempfile.mkdtemp()
+                try:
+                    compressing_handler = UploadHandler(folder, server.url, compress=compress, password=PASSWORD)
+                    for _ in range(5):
+                        compressing_handler.upload_json_database(json_database, force=True)
+                    with open(os.path.join(folder, "upload_metrics.log"), "r") as metrics_file:
+                        metrics[compress] = [json.loads(line) for line in metrics_file]
+                finally:
+                    shutil.rmtree(folder)
+
+            plain, compressed = metrics[False][-1], metrics[True][-1]
+            print("{0:>6} {1:>10.1f} {2:>12.2f} {3:>12.1f} {4:>12.2f} {5:>12.1f}".format(
+                scale, plain["size"] / 1024.0, min(m["total_time"] for m in metrics[False]) * 1e3,
+                compressed["encoded_size"] / 1024.0, min(m["total_time"] for m in metrics[True]) * 1e3,
+                plain["size"] / float(compressed["encoded_size"])))
+
+        print()
+        print("{0:>12} {1:>16} {2:>16}".format("latency (ms)", "sequential (ms)", "concurrent (ms)"))
+        # forced, or every upload after the first would be skipped because nothing changed
+        uploads = [lambda: handler.upload_results(results),
+                   lambda: handler.upload_database(model, force=True),
+                   lambda: handler.upload_sponsors(model, force=True)]
+        for latency in latencies:
+            server.latency = latency / 1e3
+            sequential, _ = measure(server, lambda: [upload() for upload in uploads], number=5)
+            concurrent, _ = measure(server, lambda: handler.upload_concurrently(uploads), number=5)
+            print("{0:>12} {1:>16.2f} {2:>16.2f}".format(latency, sequential, concurrent))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [0, 20, 100])
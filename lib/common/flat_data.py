@@ -81,6 +81,13 @@ class FlatData:
         """
         return self.__sponsors
 
+    @property
+    def referees_and_jury_by_game(self):
+        """
+        @rtype: Dict[str, Dict[str, str]]
+        """
+        return self.__referees_and_jury_by_game
+
     def get_referees_and_jury_by_game(self, game):
         """
         @type game: Game
@@ -0,0 +1,26 @@
+from functools import lru_cache
+from json.encoder import encode_basestring
+
+
+def encode_string(value):
+    """
+    Encode a value as a quoted json string, escaping quotes, backslashes and control characters
+    @type value: object
+    @rtype: str
+    """
+    try:
+        return encode_basestring(value)
+    except TypeError:
+        # Excel hands over numbers for names that look like numbers
+        return encode_basestring(str(value))
+
+
+@lru_cache(maxsize=4096)
+def encode_datetime(value):
+    """
+    Encode a datetime as a quoted json string in the format the app expects.
+    Many games share the same time slot, and strftime is relatively slow
+    @type value: datetime
+    @rtype: str
+    """
+    return "\"" + value.strftime("%d-%m-%Y %H:%M:%S") + "\""
@@ -1,8 +1,19 @@
 import collections
 
+from itertools import groupby
+
 
 class ExcelBase:
-    def __init__(self, workbook):
+    def __init__(self, workbook, written_sheets=None):
+        """
+        @param written_sheets: what was last written to every sheet by name, as kept by _write_sheet; when given,
+        sheets that were written before are only updated where their contents differ from that
+        @type written_sheets: dict[str, tuple[int, int, list[list], list[tuple[int, int, int]]]]
+        """
+        # the columns of every sheet read so far, so that each sheet is read from Excel only once
+        self.__columns_by_sheet = {}
+        self.__written_sheets = written_sheets
+
         count = 0
 
         try:
@@ -29,42 +40,181 @@ class ExcelBase:
         if count == 0:
             raise Exception("Not all required sheets are present in the workbook")
 
+    def _prefetch(self, *sheets):
+        """
+        Read all sheets an entry point needs up front, so that the round trips to Excel happen in one pass
+        @type sheets: list[xlwings.Sheet]
+        @rtype: None
+        """
+        for sheet in sheets:
+            self._get_columns(sheet)
+
+    def _get_columns(self, sheet):
+        """
+        Get the contents of a sheet as a list of header-contents tuples, as read by _load_sheet.
+        The sheet is only read from Excel the first time; after that it is served from memory until it is written
+        @type sheet: xlwings.Sheet
+        @rtype: list[tuple[str, list[str]]]
+        """
+        return self.__get_cached_columns(sheet)[0]
+
+    def _get_columns_by_header(self, sheet):
+        """
+        Get the contents of a sheet by header, as read by _get_columns
+        @type sheet: xlwings.Sheet
+        @rtype: dict[str, list[str]]
+        """
+        return self.__get_cached_columns(sheet)[1]
+
+    def __get_cached_columns(self, sheet):
+        # xlwings sheets are not hashable; they live as long as this object
+        key = id(sheet)
+        if key not in self.__columns_by_sheet:
+            columns = self._load_sheet(sheet)
+            self.__columns_by_sheet[key] = (columns, {header: values for header, values in columns})
+        return self.__columns_by_sheet[key]
+
     @staticmethod
     def _load_sheet(sheet):
         """
         Get the contents of a sheet as a list of header-contents tuples
+        Only the used part of the sheet is read, in one go
         @type sheet: xlwings.Sheet
         @rtype: list[tuple[str, list[str]]]
         """
         result = []
 
-        values = sheet.range("A1:CZ100").value
-        values = [list(i) for i in zip(*values)]  # transpose
-        useful_columns = [column for column in values if column[0] is not None]
-        for useful_column in useful_columns:
-            # fetch all data in the column until the first non-empty cell
-            for i, value in enumerate(reversed(useful_column)):
-                if value is not None:
-                    result.append((useful_column[0], useful_column[1:-i]))
-                    break
+        last_cell = sheet.used_range.last_cell
+        values = sheet.range((1, 1), (last_cell.row, last_cell.column)).options(ndim=2).value
+
+        for column in zip(*values):  # transpose
+            if column[0] is None:
+                continue
+
+            # fetch all data in the column until the last non-empty cell
+            length = len(column)
+            while column[length - 1] is None:
+                length -= 1
+            result.append((column[0], list(column[1:length])))
 
         return result
 
-    def _write_sheet(self, sheet, matrix, start_row=0, start_column=0, row_colors=[]):
+    def _write_sheet(self, sheet, matrix, start_row=0, start_column=0, row_colors=[], autofit=True, key_column=None):
+        """
+        Clear the sheet and write the matrix to it, coloring the rows with the given colors
+        Consecutive rows with the same color are colored at once; rows without color are left as cleared
+        If the same block was written to the sheet before, only the cells and row colors that differ from what was
+        written then are updated, which leaves everything else on the sheet alone. When a key column is given, that
+        is only done when the sheet still has the rows that were written; otherwise it is written in full
+        @type sheet: xlwings.Sheet
+        @type matrix: list[list]
+        @type start_row: int
+        @type start_column: int
+        @type row_colors: list[tuple[int, int, int]]
+        @param autofit: fit the width of the columns to their contents
+        @type autofit: bool
+        @param key_column: the index in the matrix of a column that identifies the rows, such as an id
+        @type key_column: int
+        @return: None
+        """
         row_lens = set(len(row) for row in matrix)
         if len(row_lens) != 1:
             raise Exception("Only rectangular matrices are supported")
-        sheet.clear()
-        sheet.range(self.__excel_style(start_row, start_column)).value = matrix
+        self.__columns_by_sheet.pop(id(sheet), None)
+
+        written = self.__written_sheets.get(sheet.name) if self.__written_sheets is not None else None
+        if written and written[:2] == (start_row, start_column) and len(written[2][0]) == len(matrix[0]) and \
+                (key_column is None or self.__has_rows(sheet, start_row, start_column, written[2], key_column)):
+            self.__write_changes(sheet, start_row, start_column, written[2], written[3], matrix, row_colors)
+        else:
+            sheet.clear()
+            sheet.range(self.__excel_style(start_row, start_column)).value = matrix
+
+            if row_colors:
+                row_len = next(iter(row_lens))
+                for color, rows in groupby(enumerate(row_colors), lambda row: row[1]):
+                    if color is None:
+                        continue
+
+                    rows = list(rows)
+                    color_range = "{0}:{1}".format(self.__excel_style(start_row + rows[0][0], start_column),
+                                                   self.__excel_style(start_row + rows[-1][0],
+                                                                      start_column + row_len - 1))
+                    sheet.range(color_range).color = color
+
+        if self.__written_sheets is not None:
+            self.__written_sheets[sheet.name] = (start_row, start_column, matrix, list(row_colors))
+
+        if autofit:
+            sheet.autofit("columns")
+
+    @staticmethod
+    def __has_rows(sheet, start_row, start_column, matrix, key_column):
+        """
+        Check with a single read that the sheet still has the rows of a matrix that was written to it: the key column
+        must hold the same values, with nothing below them. Rows that were inserted, deleted or sorted, or another
+        workbook, fail the check
+        @type sheet: xlwings.Sheet
+        @type start_row: int
+        @type start_column: int
+        @type matrix: list[list]
+        @type key_column: int
+        @rtype: bool
+        """
+        column = start_column + key_column + 1
+        values = sheet.range((start_row + 1, column), (start_row + len(matrix) + 1, column)).value
+
+        expected = [row[key_column] for row in matrix] + [None]
+        # empty strings and empty cells are the same to Excel
+        return [None if value == "" else value for value in values] == \
+            [None if value == "" else value for value in expected]
+
+    def __write_changes(self, sheet, start_row, start_column, old_matrix, old_colors, matrix, row_colors):
+        """
+        Update a sheet that holds old_matrix to hold matrix. Consecutive rows whose cells changed in the same columns
+        are written as one block per run of changed columns; cells that did not change are never written.
+        Rows that are no longer in the matrix are emptied
+        @type sheet: xlwings.Sheet
+        @type start_row: int
+        @type start_column: int
+        @type old_matrix: list[list]
+        @type old_colors: list[tuple[int, int, int]]
+        @type matrix: list[list]
+        @type row_colors: list[tuple[int, int, int]]
+        @return: None
+        """
+        row_len = len(matrix[0])
+        row_count = max(len(old_matrix), len(matrix))
+
+        def get_row(rows, i):
+            # empty strings and empty cells are the same to Excel
+            return [None if value == "" else value for value in rows[i]] if i < len(rows) else [None] * row_len
+
+        def get_color(colors, i):
+            return colors[i] if i < len(colors) else None
+
+        changed_columns_by_row = []
+        for i in range(row_count):
+            old_row, new_row = get_row(old_matrix, i), get_row(matrix, i)
+            changed = [j for j in range(row_len) if old_row[j] != new_row[j]]
+            # runs of consecutive changed columns as (first, last) tuples
+            runs = tuple((group[0][1], group[-1][1])
+                         for group in (list(g) for _, g in groupby(enumerate(changed), lambda c: c[1] - c[0])))
+            changed_columns_by_row.append((i, runs, new_row))
 
-        if row_colors:
-            row_len = next(iter(row_lens))
-            for i, color in enumerate(row_colors):
-                color_range = "{0}:{1}".format(self.__excel_style(start_row + i, start_column),
-                                               self.__excel_style(start_row + i, start_column + row_len - 1))
-                sheet.range(color_range).color = color
+        for runs, rows in groupby(changed_columns_by_row, lambda row: row[1]):
+            rows = list(rows)
+            for first, last in runs:
+                sheet.range(self.__excel_style(start_row + rows[0][0], start_column + first)).value = \
+                    [new_row[first:last + 1] for _, _, new_row in rows]
 
-        sheet.autofit("columns")
+        changed_colors = [(i, get_color(row_colors, i)) for i in range(row_count)
+                          if get_color(old_colors, i) != get_color(row_colors, i)]
+        for _, rows in groupby(enumerate(changed_colors), lambda row: (row[1][0] - row[0], row[1][1])):
+            rows = [row for _, row in rows]
+            color_range = "{0}:{1}".format(self.__excel_style(start_row + rows[0][0], start_column),
+                                           self.__excel_style(start_row + rows[-1][0], start_column + row_len - 1))
+            sheet.range(color_range).color = rows[0][1]
 
     @staticmethod
     def __excel_style(row, col):
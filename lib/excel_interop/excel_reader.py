@@ -11,6 +11,9 @@ class ExcelReader(ExcelBase):
         ExcelBase.__init__(self, workbook)
 
     def read(self):
+        self._prefetch(self.pools_sheet, self.teams_sheet, self.referees_sheet, self.games_sheet, self.sponsors_sheet,
+                       self.schedule_sheet, self.schedule_pitch4_sheet)
+
         categories, pools = self.__read_categories_and_pools()
         pool_info = self.__read_pool_infos()
         referees = self.__read_referees()
@@ -27,7 +30,7 @@ class ExcelReader(ExcelBase):
         """
         result = {}
         try:
-            all_columns = self._load_sheet(self.schedule_sheet) + self._load_sheet(self.schedule_pitch4_sheet)
+            all_columns = self._get_columns(self.schedule_sheet) + self._get_columns(self.schedule_pitch4_sheet)
 
             for pitch in pitches:
                 result.update(self.__read_referees_and_jury_for_pitch(pitch, all_columns))
@@ -70,7 +73,7 @@ class ExcelReader(ExcelBase):
     def __read_categories_and_pools(self):
         categories = []
         pools_by_category = {}
-        for h, v in self._load_sheet(self.pools_sheet):
+        for h, v in self._get_columns(self.pools_sheet):
             if h in pools_by_category:
                 raise Exception("Duplicate header " + h)
 
@@ -85,7 +88,7 @@ class ExcelReader(ExcelBase):
 
     def __read_pool_infos(self):
         result = {}
-        for h, v in self._load_sheet(self.teams_sheet):
+        for h, v in self._get_columns(self.teams_sheet):
             if h in result:
                 raise Exception("Duplicate header " + h)
             result[h] = (self.__convert_pool_type(v[0]), v[1:])
@@ -114,10 +117,10 @@ class ExcelReader(ExcelBase):
         """
         @rtype: list[str]
         """
-        return self._load_sheet(self.referees_sheet)[0][1]
+        return self._get_columns(self.referees_sheet)[0][1]
 
     def __read_sponsors(self):
-        columns = self._load_sheet(self.sponsors_sheet)
+        columns = self._get_columns(self.sponsors_sheet)
 
         names = []
         uris = []
@@ -134,7 +137,7 @@ class ExcelReader(ExcelBase):
         pitches = []
         games_by_pitch = {}
         timestamps = []
-        for h, c in self._load_sheet(self.games_sheet):
+        for h, c in self._get_columns(self.games_sheet):
             if h == "Tijd":
                 timestamps = c
             else:
@@ -148,6 +151,8 @@ class ExcelReader(ExcelBase):
         return pitches, games_by_pitch
 
     def load_results(self):
+        self.__prefetch_printable_schedules()
+
         result = {}
         result.update(self.__load_results(self.printable_schedule_saturday_sheet))
         result.update(self.__load_results(self.printable_schedule_saturday_pitch4_sheet))
@@ -156,6 +161,8 @@ class ExcelReader(ExcelBase):
         return result
 
     def load_referees_and_juries(self):
+        self.__prefetch_printable_schedules()
+
         result = {}
         result.update(self.__load_referees_and_juries(self.printable_schedule_saturday_sheet))
         result.update(self.__load_referees_and_juries(self.printable_schedule_saturday_pitch4_sheet))
@@ -163,15 +170,98 @@ class ExcelReader(ExcelBase):
 
         return result
 
+    def load_changed_results(self, fingerprints, known_results=None):
+        """
+        Like load_results, but only for the rows of which the DW and DB differ from the fingerprints of the previous
+        run. Games of which the result was erased since, or that are no longer on the sheets, get None.
+        The fingerprints of this run are returned as well; they should only replace the previous ones once the
+        results are stored, so that the same rows are handed back again when that fails
+        @param fingerprints: the DW and DB of every game by name, as returned by the previous run
+        @type fingerprints: dict[str, tuple]
+        @param known_results: the results the model has by game name; rows without a fingerprint are compared with
+        these, so that a result that was erased is noticed even when there are no fingerprints
+        @type known_results: dict[str, GameResult]
+        @rtype: tuple[dict[str, GameResult], dict[str, tuple]]
+        """
+        self.__prefetch_printable_schedules()
+
+        rows = self.__get_rows_by_game(["DW", "DB"], None)
+
+        previous_rows = {game_id: (game_result.home_score, game_result.away_score)
+                         for game_id, game_result in (known_results or {}).items()}
+        previous_rows.update(fingerprints)
+
+        result = {game_id: GameResult(home, away) if home is not None and away is not None else None
+                  for game_id, (home, away) in rows.items()
+                  if self.__has_changed(game_id, (home, away), previous_rows)}
+        result.update((game_id, None) for game_id in previous_rows if game_id not in rows)
+
+        return result, rows
+
+    def load_changed_referees_and_juries(self, fingerprints, known_referees_and_juries=None):
+        """
+        Like load_referees_and_juries, but only for the rows of which the Scheidsrechters and Jury differ from the
+        fingerprints of the previous run; see load_changed_results. Cleared cells are read as empty strings
+        @param fingerprints: the Scheidsrechters and Jury of every game by name, as returned by the previous run
+        @type fingerprints: dict[str, tuple]
+        @param known_referees_and_juries: the referees string and jury the model has by game name; rows without a
+        fingerprint are compared with these, so that cleared referees or juries are noticed even when there are no
+        fingerprints
+        @type known_referees_and_juries: dict[str, tuple[str, str]]
+        @rtype: tuple[dict[str, dict[str, str]], dict[str, tuple]]
+        """
+        self.__prefetch_printable_schedules()
+
+        rows = {game_id: (referees or "", jury or "")
+                for game_id, (referees, jury) in self.__get_rows_by_game(["Scheidsrechters", "Jury"], "").items()}
+
+        previous_rows = dict(known_referees_and_juries or {})
+        previous_rows.update(fingerprints)
+
+        result = {game_id: {"referees": referees, "jury": jury}
+                  for game_id, (referees, jury) in rows.items()
+                  if self.__has_changed(game_id, (referees, jury), previous_rows)}
+
+        return result, rows
+
+    @staticmethod
+    def __has_changed(game_id, row, fingerprints):
+        # a row that was not read before only counts when something was entered in it
+        if game_id not in fingerprints:
+            return any(value is not None and value != "" for value in row)
+        return fingerprints[game_id] != row
+
+    def __get_rows_by_game(self, headers, fillvalue):
+        """
+        The values under the given headers on the printable schedules, by game
+        @type headers: list[str]
+        @param fillvalue: the value of cells below the last filled cell of their column
+        @rtype: dict[str, tuple]
+        """
+        result = {}
+        for sheet in [self.printable_schedule_saturday_sheet, self.printable_schedule_saturday_pitch4_sheet,
+                      self.printable_schedule_sunday_sheet]:
+            sheet_dict = self._get_columns_by_header(sheet)
+            for row in zip_longest(sheet_dict["Id"], *[sheet_dict[header] for header in headers],
+                                   fillvalue=fillvalue):
+                if row[0]:
+                    result[row[0]] = row[1:]
+
+        return result
+
+    def __prefetch_printable_schedules(self):
+        self._prefetch(self.printable_schedule_saturday_sheet, self.printable_schedule_saturday_pitch4_sheet,
+                       self.printable_schedule_sunday_sheet)
+
     def __load_results(self, sheet):
-        sheet_dict = {column[0]: column[1] for column in self._load_sheet(sheet)}
+        sheet_dict = self._get_columns_by_header(sheet)
 
         return {game_id: GameResult(home, away)
                 for game_id, home, away in zip(sheet_dict["Id"], sheet_dict["DW"], sheet_dict["DB"])
                 if home is not None and away is not None}
 
     def __load_referees_and_juries(self, sheet):
-        sheet_dict = {column[0]: column[1] for column in self._load_sheet(sheet)}
+        sheet_dict = self._get_columns_by_header(sheet)
 
         return {game_id: {"referees": referees, "jury": jury}
                 for game_id, referees, jury
@@ -4,8 +4,8 @@ from .excel_base import ExcelBase
 
 
 class ExcelWriter(ExcelBase):
-    def __init__(self, workbook):
-        ExcelBase.__init__(self, workbook)
+    def __init__(self, workbook, written_sheets=None):
+        ExcelBase.__init__(self, workbook, written_sheets)
 
     def write_game_schedule(self, game_schedule):
         """
@@ -126,10 +126,12 @@ class ExcelWriter(ExcelBase):
 
         self._write_sheet(self.games_per_team_sheet, matrix)
 
-    def write_printable_game_schedule(self, game_schedule, pool_by_game):
+    def write_printable_game_schedule(self, game_schedule, pool_by_game, autofit=True):
         """
         @type game_schedule: GameSchedule
         @type pool_by_game: Dict[Game, Pool]
+        @param autofit: fit the columns to their contents; not needed when the schedule was printed before
+        @type autofit: bool
         @return:
         """
 
@@ -141,11 +143,14 @@ class ExcelWriter(ExcelBase):
         normal_games_sunday = [game for game in normal_games if game.datetime.date() == game_schedule.dates[1]]
         special_games = game_schedule.get_games_sorted_by_datetime(special_pitches)
 
-        self.__write_printable_game_schedule(self.printable_schedule_saturday_sheet, normal_games_saturday, pool_by_game)
-        self.__write_printable_game_schedule(self.printable_schedule_sunday_sheet, normal_games_sunday, pool_by_game)
-        self.__write_printable_game_schedule(self.printable_schedule_saturday_pitch4_sheet, special_games, pool_by_game)
+        self.__write_printable_game_schedule(self.printable_schedule_saturday_sheet, normal_games_saturday,
+                                             pool_by_game, autofit)
+        self.__write_printable_game_schedule(self.printable_schedule_sunday_sheet, normal_games_sunday,
+                                             pool_by_game, autofit)
+        self.__write_printable_game_schedule(self.printable_schedule_saturday_pitch4_sheet, special_games,
+                                             pool_by_game, autofit)
 
-    def __write_printable_game_schedule(self, sheet, games, pool_by_game):
+    def __write_printable_game_schedule(self, sheet, games, pool_by_game, autofit):
         matrix = [["Tijd", "Veld", "Poule", "Wit", "", "Blauw", "Scheidsrechters", "Jury", "DW", "", "DB", "Id"]]
 
         alternate_colors = (None, (200, 200, 200))
@@ -176,4 +181,4 @@ class ExcelWriter(ExcelBase):
                 previous_color_index = color_index
             colors.append(alternate_colors[color_index])
 
-        self._write_sheet(sheet, matrix, row_colors=colors)
+        self._write_sheet(sheet, matrix, row_colors=colors, autofit=autofit, key_column=matrix[0].index("Id"))
@@ -0,0 +1,302 @@
+import datetime
+import os
+
+
+class FileWorkbook:
+    """
+    An .xlsx or .xlsm file behind the part of the xlwings.Book interface that ExcelReader and ExcelWriter use,
+    so that they can run without Excel. Values are read the way xlwings reads them: numbers as floats, times as
+    datetimes and empty cells as None
+    """
+
+    def __init__(self, path, read_only=False):
+        """
+        @param path: the workbook file; macros in an .xlsm file are kept when it is saved
+        @type path: str
+        @param read_only: stream the rows of every sheet once instead of loading all cells; for large files that are
+        only read
+        @type read_only: bool
+        @rtype: None
+        """
+        # openpyxl is only needed when working on files, not for the macros that run in Excel through xlwings
+        import openpyxl
+
+        self.path = path
+        self.read_only = read_only
+        self.__workbook = openpyxl.load_workbook(path, read_only=read_only, data_only=read_only,
+                                                 keep_vba=path.lower().endswith(".xlsm") and not read_only)
+        self.__values_workbook = None
+        self.__sheets = {}
+
+    @property
+    def fullname(self):
+        """
+        The absolute path of the file, like xlwings.Book.fullname
+        @rtype: str
+        """
+        return os.path.abspath(self.path)
+
+    def sheets(self, name):
+        """
+        @type name: str
+        @rtype: FileSheet
+        """
+        if name not in self.__sheets:
+            self.__sheets[name] = FileSheet(self, self.__workbook[name])
+        return self.__sheets[name]
+
+    def save(self, path=None):
+        """
+        @param path: where to save the workbook; the file it was opened from by default
+        @type path: str
+        @rtype: None
+        """
+        if self.read_only:
+            raise Exception("The workbook is opened read-only")
+        self.__workbook.save(path or self.path)
+
+    def get_values_worksheet(self, name):
+        """
+        The values of the formulas in a sheet as last calculated by Excel; only needed when a sheet has formulas
+        @type name: str
+        @rtype: openpyxl.worksheet.worksheet.Worksheet
+        """
+        if self.__values_workbook is None:
+            import openpyxl
+            self.__values_workbook = openpyxl.load_workbook(self.path, data_only=True)
+        return self.__values_workbook[name]
+
+
+class FileSheet:
+    """
+    A sheet of a FileWorkbook, behind the part of the xlwings.Sheet interface that ExcelReader and ExcelWriter use
+    """
+
+    def __init__(self, workbook, worksheet):
+        """
+        @type workbook: FileWorkbook
+        @type worksheet: openpyxl.worksheet.worksheet.Worksheet
+        @rtype: None
+        """
+        self.workbook = workbook
+        self.name = worksheet.title
+        self.__worksheet = worksheet
+        # the rows of a read-only sheet, streamed from the file once
+        self.__rows = None
+
+    def range(self, address, last_cell=None):
+        """
+        @param address: "A1", "A1:L4" or a (row, column) tuple, 1-based like xlwings
+        @param last_cell: the (row, column) tuple of the bottom right cell, when address is a tuple
+        @rtype: FileRange
+        """
+        if isinstance(address, tuple):
+            last_cell = last_cell or address
+            return FileRange(self, address[0], address[1], last_cell[0], last_cell[1])
+
+        from openpyxl.utils.cell import range_boundaries
+        first_column, first_row, last_column, last_row = range_boundaries(address)
+        return FileRange(self, first_row, first_column, last_row, last_column)
+
+    @property
+    def used_range(self):
+        """
+        @rtype: FileRange
+        """
+        if self.workbook.read_only:
+            rows = self.__get_rows()
+            return FileRange(self, 1, 1, max(len(rows), 1), max([len(row) for row in rows] or [1]))
+        return FileRange(self, 1, 1, max(self.__worksheet.max_row, 1), max(self.__worksheet.max_column, 1))
+
+    def clear(self):
+        """
+        Remove all contents and formatting, like xlwings.Sheet.clear
+        @rtype: None
+        """
+        self.__check_writable()
+        self.__worksheet.delete_rows(1, self.__worksheet.max_row)
+
+    def autofit(self, axis=None):
+        """
+        Files carry no rendering information, so the width of the columns is estimated from the length of the text
+        @param axis: only "columns" is supported
+        @rtype: None
+        """
+        self.__check_writable()
+        if axis not in (None, "c", "columns"):
+            return
+
+        from openpyxl.utils.cell import get_column_letter
+        for i, column in enumerate(self.__worksheet.iter_cols(values_only=True)):
+            width = max([len(str(value)) for value in column if value is not None] or [0])
+            if width:
+                self.__worksheet.column_dimensions[get_column_letter(i + 1)].width = width + 2
+
+    def get_values(self, first_row, first_column, last_row, last_column):
+        """
+        @rtype: list[list]
+        """
+        if self.workbook.read_only:
+            rows = self.__get_rows()
+            matrix = [list(rows[row - 1][first_column - 1:last_column]) if row <= len(rows) else []
+                      for row in range(first_row, last_row + 1)]
+            return [[self.__to_xlwings(value) for value in row] + [None] * (last_column - first_column + 1 - len(row))
+                    for row in matrix]
+
+        matrix = [list(row) for row in self.__worksheet.iter_rows(min_row=first_row, max_row=last_row,
+                                                                  min_col=first_column, max_col=last_column,
+                                                                  values_only=True)]
+        # formulas are read as the values Excel calculated for them, like xlwings does
+        if any(isinstance(value, str) and value.startswith("=") for row in matrix for value in row):
+            values_worksheet = self.workbook.get_values_worksheet(self.name)
+            matrix = [[values_worksheet.cell(first_row + r, first_column + c).value
+                       if isinstance(value, str) and value.startswith("=") else value
+                       for c, value in enumerate(row)]
+                      for r, row in enumerate(matrix)]
+        return [[self.__to_xlwings(value) for value in row] for row in matrix]
+
+    def set_values(self, first_row, first_column, matrix):
+        """
+        @type first_row: int
+        @type first_column: int
+        @type matrix: list[list]
+        @rtype: None
+        """
+        self.__check_writable()
+        for r, row in enumerate(matrix):
+            for c, value in enumerate(row):
+                self.__worksheet.cell(first_row + r, first_column + c).value = None if value == "" else value
+
+    def get_color(self, row, column):
+        """
+        @rtype: tuple[int, int, int]
+        """
+        fill = self.__worksheet.cell(row, column).fill
+        if fill.fill_type is None or not isinstance(fill.fgColor.rgb, str):
+            return None
+        rgb = fill.fgColor.rgb[-6:]
+        return int(rgb[0:2], 16), int(rgb[2:4], 16), int(rgb[4:6], 16)
+
+    def set_color(self, first_row, first_column, last_row, last_column, color):
+        """
+        @param color: an (r, g, b) tuple, or None to remove the fill
+        @type color: tuple[int, int, int]
+        @rtype: None
+        """
+        self.__check_writable()
+
+        from openpyxl.styles import PatternFill
+        fill = PatternFill("solid", fgColor="{0:02X}{1:02X}{2:02X}".format(*color)) if color else PatternFill()
+        for row in self.__worksheet.iter_rows(min_row=first_row, max_row=last_row,
+                                              min_col=first_column, max_col=last_column):
+            for cell in row:
+                cell.fill = fill
+
+    def __get_rows(self):
+        if self.__rows is None:
+            self.__rows = [row for row in self.__worksheet.iter_rows(values_only=True)]
+            # trailing empty rows are part of the dimensions that some writers record
+            while self.__rows and all(value is None for value in self.__rows[-1]):
+                self.__rows.pop()
+        return self.__rows
+
+    def __check_writable(self):
+        if self.workbook.read_only:
+            raise Exception("The workbook is opened read-only")
+
+    @staticmethod
+    def __to_xlwings(value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int):
+            return float(value)
+        if isinstance(value, datetime.time):
+            return datetime.datetime.combine(datetime.date(1899, 12, 30), value)
+        return value
+
+
+class FileRange:
+    """
+    A rectangle of cells on a FileSheet, behind the part of the xlwings.Range interface that ExcelReader and
+    ExcelWriter use
+    """
+
+    def __init__(self, sheet, row, column, last_row, last_column, ndim=None):
+        """
+        @type sheet: FileSheet
+        @type row: int
+        @type column: int
+        @type last_row: int
+        @type last_column: int
+        @type ndim: int
+        @rtype: None
+        """
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+        self.last_row = last_row
+        self.last_column = last_column
+        self.__ndim = ndim
+
+    @property
+    def last_cell(self):
+        """
+        @rtype: FileRange
+        """
+        return FileRange(self.sheet, self.last_row, self.last_column, self.last_row, self.last_column)
+
+    @property
+    def shape(self):
+        """
+        @rtype: tuple[int, int]
+        """
+        return self.last_row - self.row + 1, self.last_column - self.column + 1
+
+    def options(self, ndim=None, **kwargs):
+        """
+        @param ndim: 2 to always read a list of rows
+        @type ndim: int
+        @rtype: FileRange
+        """
+        return FileRange(self.sheet, self.row, self.column, self.last_row, self.last_column, ndim)
+
+    @property
+    def value(self):
+        """
+        Like xlwings: a scalar for one cell, a list for one row or column, and a list of rows otherwise,
+        unless ndim=2 is given
+        """
+        matrix = self.sheet.get_values(self.row, self.column, self.last_row, self.last_column)
+        rows, columns = self.shape
+
+        if self.__ndim == 2:
+            return matrix
+        if rows == 1 and columns == 1:
+            return matrix[0][0]
+        if rows == 1:
+            return matrix[0]
+        if columns == 1:
+            return [row[0] for row in matrix]
+        return matrix
+
+    @value.setter
+    def value(self, value):
+        """
+        Like xlwings, a list of rows is written from the top left cell of the range; empty strings clear cells
+        """
+        matrix = value if isinstance(value, list) else [[value]]
+        if matrix and not isinstance(matrix[0], (list, tuple)):
+            matrix = [matrix]
+        self.sheet.set_values(self.row, self.column, matrix)
+
+    @property
+    def color(self):
+        """
+        The color of the top left cell, like xlwings
+        @rtype: tuple[int, int, int]
+        """
+        return self.sheet.get_color(self.row, self.column)
+
+    @color.setter
+    def color(self, color):
+        self.sheet.set_color(self.row, self.column, self.last_row, self.last_column, color)
@@ -27,11 +27,11 @@ class Builder:
             for flat_pool in flat_data.get_pools_by_category(flat_category):
                 pool = self.__factory.create_pool(flat_pool[0], flat_pool[1], self.__convert_pool_type(flat_pool[2]))
                 pools_by_abbreviation[pool.abbreviation] = pool
-                category.add_pool(pool)
+                model.add_pool(category, pool)
 
                 for flat_team in flat_data.get_teams_by_pool_abbr(pool.abbreviation):
                     team = self.__factory.create_team(flat_team)
-                    pool.add_team(team)
+                    model.add_team(pool, team)
 
         for flat_referee in flat_data.referees:
             referee = self.__factory.create_referee(flat_referee)
@@ -57,13 +57,12 @@ class Builder:
         referees_by_name.update({referee.name: referee for referee in model.referees})
         referees_by_name.update({referee.get_first_name(): referee for referee in model.referees})
 
-        for game in model.games:
-            referees_and_jury = flat_data.get_referees_and_jury_by_game(game)
-            if referees_and_jury:
-                if referees_and_jury["referee1"]:
-                    game.referee1 = referees_by_name[referees_and_jury["referee1"]]
-                if referees_and_jury["referee2"]:
-                    game.referee2 = referees_by_name[referees_and_jury["referee2"]]
+        for name, referees_and_jury in flat_data.referees_and_jury_by_game.items():
+            game = model.game_schedule.get_game_by_name(name)
+            if game and referees_and_jury:
+                referee1, referee2 = referees_and_jury["referee1"], referees_and_jury["referee2"]
+                game.set_referees(referees_by_name[referee1] if referee1 else game.referee1,
+                                  referees_by_name[referee2] if referee2 else game.referee2)
                 game.jury = referees_and_jury["jury"]
 
         return model
@@ -1,24 +1,341 @@
+import json
 import os
 import pickle
+import struct
+import zlib
 
+from lib.model.game_result import GameResult
 from lib.model.model import Model
 
 
 class PersistenceHandler:
-    def __init__(self, folder):
-        self.__model_file_name = os.path.join("model.bin")
+    # snapshot header: magic, format version, flags, crc32 of the section index, index length
+    __header = struct.Struct(">4sHHIQ")
+    __magic = b"SBCM"
+    __version = 4
+    __compressed_flag = 1
+
+    # every section of a snapshot can be loaded on its own; this is how each one is taken from the model
+    # the game schedule and the pools reach the whole object graph through their observers,
+    # so they are taken from the model section rather than stored a second time
+    __sections = [
+        ("model", lambda model: model),
+        ("json_database", lambda model: model.get_json_database()),
+        ("json_sponsors", lambda model: model.get_json_sponsors()),
+    ]
+
+    def __init__(self, folder, snapshot_interval=100, compress=False):
+        """
+        The model is persisted as a full snapshot plus an append-only journal of changes since that snapshot.
+        A new snapshot is written once the journal holds snapshot_interval records
+        @type folder: str
+        @type snapshot_interval: int
+        @type compress: bool
+        @rtype: None
+        """
+        self.__model_file_name = os.path.join(folder, "model.bin")
+        self.__journal_file_name = os.path.join(folder, "model.journal")
+        self.__written_sheets_file_name = os.path.join(folder, "sheets.bin")
+        self.__fingerprints_file_name = os.path.join(folder, "fingerprints.bin")
+        self.__snapshot_interval = snapshot_interval
+        self.__compress = compress
+        # the number of records in the journal, once it is known
+        self.__journal_length = None
 
     def store_model(self, model):
         """
+        Write a full snapshot of the model and start with an empty journal
         @type model: Model
         @return: None
         """
-        with open(self.__model_file_name, "wb") as output_file:
-            pickle.dump(model, output_file)
+        flags = self.__compressed_flag if self.__compress else 0
+
+        index = {}
+        payloads = []
+        offset = 0
+        for name, extract in self.__sections:
+            payload = pickle.dumps(extract(model), pickle.HIGHEST_PROTOCOL)
+            if self.__compress:
+                payload = zlib.compress(payload, 1)
+
+            index[name] = [offset, len(payload), zlib.crc32(payload)]
+            payloads.append(payload)
+            offset += len(payload)
+
+        index_data = json.dumps(index).encode("utf-8")
+
+        # write to a temporary file first, so that a crash never leaves a half-written snapshot behind
+        temporary_file_name = self.__model_file_name + ".tmp"
+        with open(temporary_file_name, "wb") as output_file:
+            output_file.write(self.__header.pack(self.__magic, self.__version, flags,
+                                                 zlib.crc32(index_data), len(index_data)))
+            output_file.write(index_data)
+            for payload in payloads:
+                output_file.write(payload)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        os.replace(temporary_file_name, self.__model_file_name)
+
+        # all records are part of the snapshot now; replaying them again would be harmless
+        if os.path.exists(self.__journal_file_name):
+            os.remove(self.__journal_file_name)
+        self.__journal_length = 0
+
+        # the fingerprints may describe another model; without them, all rows of the workbook are read once more
+        if os.path.exists(self.__fingerprints_file_name):
+            os.remove(self.__fingerprints_file_name)
 
     def load_model(self):
         """
+        Load the last snapshot and replay the journal on top of it
         @rtype: Model
         """
+        model = self.__read_section("model")
+
+        self.__replay(model, self.__read_journal())
+
+        return model
+
+    def load_game_schedule(self):
+        """
+        Load the game schedule, for read-only use; it needs the whole model
+        @rtype: GameSchedule
+        """
+        return self.__load_section("model").game_schedule
+
+    def load_pools(self):
+        """
+        Load the (main) pools with their games and rankings, for read-only use; they need the whole model
+        @rtype: tuple[Pool]
+        """
+        return self.__load_section("model").pools
+
+    def load_json_database(self):
+        """
+        Load the database as needed by the app, without loading the model
+        @rtype: str
+        """
+        return self.__load_section("json_database")
+
+    def load_json_sponsors(self):
+        """
+        Load the sponsors as needed by the app, without loading the model
+        @rtype: str
+        """
+        return self.__load_section("json_sponsors")
+
+    def __load_section(self, name):
+        """
+        Load a single section of the snapshot. When the journal holds changes that are not
+        in the snapshot yet, the full model is loaded instead and the section is taken from it
+        @type name: str
+        @rtype: object
+        """
+        if self.__read_journal():
+            return dict(self.__sections)[name](self.load_model())
+
+        return self.__read_section(name)
+
+    def __read_section(self, name):
+        """
+        @type name: str
+        @rtype: object
+        """
         with open(self.__model_file_name, "rb") as input_file:
-            return pickle.load(input_file)
+            header = input_file.read(self.__header.size)
+
+            if not header.startswith(self.__magic):
+                raise Exception("Snapshot {0} was written by an older version; export the model again"
+                                .format(self.__model_file_name))
+
+            magic, version, flags, checksum, length = self.__header.unpack(header)
+            if version != self.__version:
+                raise Exception("Unsupported snapshot version {0}; export the model again".format(version))
+
+            index_data = input_file.read(length)
+            if len(index_data) != length or zlib.crc32(index_data) != checksum:
+                raise Exception("Snapshot {0} is corrupt".format(self.__model_file_name))
+
+            offset, length, checksum = json.loads(index_data.decode("utf-8"))[name]
+            input_file.seek(self.__header.size + len(index_data) + offset)
+            payload = input_file.read(length)
+
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            raise Exception("Section {0} of snapshot {1} is corrupt".format(name, self.__model_file_name))
+
+        if flags & self.__compressed_flag:
+            payload = zlib.decompress(payload)
+
+        return pickle.loads(payload)
+
+    def store_written_sheets(self, workbook_name, written_sheets):
+        """
+        Keep what was last written to the sheets of the workbook, so that later writes only need to update changes
+        @param workbook_name: the full name of the workbook that was written to
+        @type workbook_name: str
+        @type written_sheets: dict[str, tuple[int, int, list[list], list[tuple[int, int, int]]]]
+        @return: None
+        """
+        self.__store_pickle(self.__written_sheets_file_name, workbook_name, written_sheets)
+
+    def load_written_sheets(self, workbook_name):
+        """
+        Load what was last written to the sheets of the workbook; nothing is known before the first write, or when
+        another workbook was written last
+        @type workbook_name: str
+        @rtype: dict[str, tuple[int, int, list[list], list[tuple[int, int, int]]]]
+        """
+        return self.__load_pickle(self.__written_sheets_file_name, workbook_name)
+
+    def store_fingerprints(self, workbook_name, fingerprints):
+        """
+        Keep the rows of the workbook as they were read by every macro, so that the next run only needs to handle the
+        rows that changed. They are valid for the model as it was stored last; a new snapshot drops them
+        @param workbook_name: the full name of the workbook that was read
+        @type workbook_name: str
+        @param fingerprints: the fingerprints of the rows by game name, by macro
+        @type fingerprints: dict[str, dict[str, tuple]]
+        @return: None
+        """
+        self.__store_pickle(self.__fingerprints_file_name, workbook_name, fingerprints)
+
+    def load_fingerprints(self, workbook_name):
+        """
+        Load the rows of the workbook as they were read by every macro; nothing is known after a new snapshot, or
+        when another workbook was read last
+        @type workbook_name: str
+        @rtype: dict[str, dict[str, tuple]]
+        """
+        return self.__load_pickle(self.__fingerprints_file_name, workbook_name)
+
+    @staticmethod
+    def __store_pickle(file_name, workbook_name, value):
+        temporary_file_name = file_name + ".tmp"
+        with open(temporary_file_name, "wb") as output_file:
+            pickle.dump((workbook_name, value), output_file, pickle.HIGHEST_PROTOCOL)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        os.replace(temporary_file_name, file_name)
+
+    @staticmethod
+    def __load_pickle(file_name, workbook_name):
+        if not os.path.exists(file_name):
+            return {}
+
+        with open(file_name, "rb") as input_file:
+            stored = pickle.load(input_file)
+
+        # what is known about one workbook says nothing about a copy or another version of it
+        if not isinstance(stored, tuple) or stored[0] != workbook_name:
+            return {}
+        return stored[1]
+
+    def store_results(self, model, new_results):
+        """
+        Append new results to the journal
+        @type model: Model
+        @type new_results: dict[int, GameResult]
+        @return: None
+        """
+        self.__append(model, [{"type": "result",
+                               "game": identifier,
+                               "home": game_result.home_score,
+                               "away": game_result.away_score}
+                              for identifier, game_result in new_results.items()])
+
+    def store_referees_and_juries(self, model, games):
+        """
+        Append the current referees and jury of the given games to the journal
+        @type model: Model
+        @type games: list[Game]
+        @return: None
+        """
+        self.__append(model, [{"type": "referees_and_jury",
+                               "game": game.id,
+                               "referee1": game.referee1.id if game.referee1 else None,
+                               "referee2": game.referee2.id if game.referee2 else None,
+                               "jury": game.jury}
+                              for game in games])
+
+    def __append(self, model, records):
+        if not records:
+            return
+
+        if self.__journal_length is None:
+            self.__journal_length = self.__repair_journal()
+
+        with open(self.__journal_file_name, "a") as journal_file:
+            for record in records:
+                journal_file.write(json.dumps(record) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        self.__journal_length += len(records)
+
+        if self.__journal_length >= self.__snapshot_interval:
+            self.store_model(model)
+
+    def __repair_journal(self):
+        """
+        Cut off the last record when a crash happened while appending it, so that the next record starts on a line
+        of its own rather than being glued onto the incomplete one
+        @return: the number of complete records in the journal
+        @rtype: int
+        """
+        if not os.path.exists(self.__journal_file_name):
+            return 0
+
+        with open(self.__journal_file_name, "rb+") as journal_file:
+            data = journal_file.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                journal_file.truncate(end)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+        return data.count(b"\n", 0, end)
+
+    def __read_journal(self):
+        """
+        @rtype: list[dict]
+        """
+        if not os.path.exists(self.__journal_file_name):
+            return []
+
+        with open(self.__journal_file_name, "r") as journal_file:
+            lines = journal_file.read().splitlines()
+
+        records = []
+        for i, line in enumerate(lines):
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # only the last record can be incomplete, when a crash happened while appending it
+                if i != len(lines) - 1:
+                    raise Exception("Corrupt journal record at line {0}".format(i + 1))
+
+        return records
+
+    @staticmethod
+    def __replay(model, records):
+        """
+        Every record holds the complete new state of a game, so replaying a record twice is harmless
+        @type model: Model
+        @type records: list[dict]
+        @return: None
+        """
+        if not records:
+            return
+
+        referees_by_id = {referee.id: referee for referee in model.referees}
+
+        with model.batch_updates():
+            for record in records:
+                game = model.game_schedule.get_game_by_id(record["game"])
+
+                if record["type"] == "result":
+                    game.set_result(GameResult(record["home"], record["away"]))
+                elif record["type"] == "referees_and_jury":
+                    game.set_referees(referees_by_id.get(record["referee1"]), referees_by_id.get(record["referee2"]))
+                    game.jury = record["jury"]
+                else:
+                    raise Exception("Unexpected journal record type " + record["type"])
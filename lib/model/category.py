@@ -1,9 +1,19 @@
+from lib.common.json_encoding import encode_string
+
+
 class Category:
+    __slots__ = ("id", "name", "rank", "pools", "__json")
+
     def __init__(self, identifier, name, rank):
         self.id = identifier
         self.name = name
         self.rank = rank
         self.pools = []
+        self.__json = None
+
+    def __getstate__(self):
+        # the json fragment is rebuilt when it is needed, so snapshots leave it out
+        return None, {"id": self.id, "name": self.name, "rank": self.rank, "pools": self.pools, "_Category__json": None}
 
     def add_pool(self, pool):
         self.pools.append(pool)
@@ -13,4 +23,7 @@ class Category:
         Convert to a json string as needed by the app
         @return: str
         """
-        return "{{\"id\": {0}, \"name\": \"{1}\", \"rank\": {2}}}".format(self.id, self.name, self.rank)
\ No newline at end of file
+        if self.__json is None:
+            self.__json = "{{\"id\": {0}, \"name\": {1}, \"rank\": {2}}}".format(self.id, encode_string(self.name),
+                                                                                self.rank)
+        return self.__json
\ No newline at end of file
@@ -0,0 +1,20 @@
+class ChangeSet:
+    def __init__(self, new_results, resolved_finals, changed_rankings):
+        """
+        The changes caused by applying a set of game results
+        @type new_results: dict[int, GameResult]
+        @type resolved_finals: list[Game]
+        @type changed_rankings: list[Pool]
+        @rtype: None
+        """
+        self.new_results = new_results
+        self.resolved_finals = resolved_finals
+        self.changed_rankings = changed_rankings
+
+    @property
+    def schedule_has_changed(self):
+        """
+        The schedule (in Excel and in the app) only changes when finals get other teams
+        @rtype: bool
+        """
+        return bool(self.resolved_finals)
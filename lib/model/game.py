@@ -1,9 +1,13 @@
 from .observable import Observable
 from .pitch import Pitch
 from .team import Team
+from lib.common.json_encoding import encode_datetime, encode_string
 
 
 class Game(Observable):
+    __slots__ = ("id", "pitch", "datetime", "home_team", "away_team", "result", "name", "referee1", "referee2", "jury",
+                 "__json")
+
     def __init__(self, identifier, pitch, datetime, home_team, away_team):
         """
         @type identifier: str
@@ -26,10 +30,44 @@ class Game(Observable):
         self.referee2 = None
         self.jury = ""
 
+        # the json fragment for the app; cleared by the setters below whenever something in it may change
+        self.__json = None
+
+    def __getstate__(self):
+        # the json fragment is rebuilt when it is needed, so snapshots leave it out; the slots of the subclasses
+        # are public
+        slots = {name: getattr(self, name) for cls in type(self).__mro__ for name in getattr(cls, "__slots__", ())
+                 if not name.startswith("__")}
+        slots["_Game__json"] = None
+        return None, slots
+
     def set_result(self, game_result):
         self.result = game_result
+        self.__json = None
         self.update_observers()
 
+    def set_referees(self, referee1, referee2):
+        """
+        @type referee1: Referee
+        @type referee2: Referee
+        @rtype: None
+        """
+        self.referee1 = referee1
+        self.referee2 = referee2
+        self.__json = None
+
+    def set_teams(self, home_team, away_team):
+        """
+        Set the teams of a game of which the teams follow from other games, such as a final
+        @type home_team: Team
+        @type away_team: Team
+        @rtype: None
+        """
+        if home_team is not self.home_team or away_team is not self.away_team:
+            self.home_team = home_team
+            self.away_team = away_team
+            self.__json = None
+
     def get_winner(self):
         if self.result:
             return self.home_team if self.result.home_score > self.result.away_score else \
@@ -65,38 +103,43 @@ class Game(Observable):
         @type pool: Pool
         @rtype: str
         """
+        if self.__json is not None:
+            return self.__json
 
         # this is a little awkward but the app cannot deal with finals having the same id as pool games
         pool_id = pool.id if self not in pool.finals else -1
 
-        return "{{\"id\": {0}, " \
-               "\"field\": {1}, " \
-               "\"date\": \"{2}\", " \
-               "\"pool\": {3}, " \
-               "\"poolAbbreviation\": \"{4}\", " \
-               "\"homeTeam\": {5}, " \
-               "\"homeTeamName\": \"{6}\", " \
-               "\"awayTeam\": {7}, " \
-               "\"awayTeamName\": \"{8}\", " \
-               "\"referee1\": {9}, " \
-               "\"referee1Name\": \"{10}\", " \
-               "\"referee2\": {11}, " \
-               "\"referee2Name\": \"{12}\"}}".format(self.id,
-                                                     self.pitch.id,
-                                                     self.datetime.strftime("%d-%m-%Y %H:%M:%S"),
-                                                     pool_id,
-                                                     pool.abbreviation,
-                                                     self.home_team.id if self.home_team else -1,
-                                                     self.get_home_team_name(),
-                                                     self.away_team.id if self.away_team else -1,
-                                                     self.get_away_team_name(),
-                                                     self.referee1.id if self.referee1 else -1,
-                                                     self.referee1.name if self.referee1 else "",
-                                                     self.referee2.id if self.referee2 else -1,
-                                                     self.referee2.name if self.referee2 else "")
+        self.__json = "{{\"id\": {0}, " \
+                      "\"field\": {1}, " \
+                      "\"date\": {2}, " \
+                      "\"pool\": {3}, " \
+                      "\"poolAbbreviation\": {4}, " \
+                      "\"homeTeam\": {5}, " \
+                      "\"homeTeamName\": {6}, " \
+                      "\"awayTeam\": {7}, " \
+                      "\"awayTeamName\": {8}, " \
+                      "\"referee1\": {9}, " \
+                      "\"referee1Name\": {10}, " \
+                      "\"referee2\": {11}, " \
+                      "\"referee2Name\": {12}}}".format(self.id,
+                                                        self.pitch.id,
+                                                        encode_datetime(self.datetime),
+                                                        pool_id,
+                                                        encode_string(pool.abbreviation),
+                                                        self.home_team.id if self.home_team else -1,
+                                                        encode_string(self.get_home_team_name()),
+                                                        self.away_team.id if self.away_team else -1,
+                                                        encode_string(self.get_away_team_name()),
+                                                        self.referee1.id if self.referee1 else -1,
+                                                        encode_string(self.referee1.name if self.referee1 else ""),
+                                                        self.referee2.id if self.referee2 else -1,
+                                                        encode_string(self.referee2.name if self.referee2 else ""))
+        return self.__json
 
 
 class RankGame(Game):
+    __slots__ = ("home_pool", "home_position", "away_pool", "away_position")
+
     def __init__(self, identifier, pitch, datetime, home_pool, home_position, away_pool, away_position):
         super(RankGame, self).__init__(identifier, pitch, datetime, None, None)
 
@@ -108,8 +151,8 @@ class RankGame(Game):
         self.update()
 
     def update(self):
-        self.home_team = self.home_pool.get_ranked_team(self.home_position)
-        self.away_team = self.away_pool.get_ranked_team(self.away_position)
+        self.set_teams(self.home_pool.get_ranked_team(self.home_position),
+                       self.away_pool.get_ranked_team(self.away_position))
 
     def get_home_team_name(self):
         if self.home_team:
@@ -125,6 +168,8 @@ class RankGame(Game):
 
 
 class ResultGame(Game):
+    __slots__ = ("home_game", "home_type", "away_game", "away_type")
+
     def __init__(self, identifier, pitch, datetime, home_game, home_type, away_game, away_type):
         super(ResultGame, self).__init__(identifier, pitch, datetime, None, None)
 
@@ -136,8 +181,8 @@ class ResultGame(Game):
         self.update()
 
     def update(self):
-        self.home_team = self.home_game.get_winner() if self.home_type == "W" else self.home_game.get_loser()
-        self.away_team = self.away_game.get_winner() if self.away_type == "W" else self.away_game.get_loser()
+        self.set_teams(self.home_game.get_winner() if self.home_type == "W" else self.home_game.get_loser(),
+                       self.away_game.get_winner() if self.away_type == "W" else self.away_game.get_loser())
 
     def get_home_team_name(self):
         if self.home_team:
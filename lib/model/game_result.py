@@ -1,4 +1,6 @@
 class GameResult:
+    __slots__ = ("home_score", "away_score")
+
     def __init__(self, home_score, away_score):
         self.home_score = home_score
         self.away_score = away_score
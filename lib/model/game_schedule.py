@@ -7,6 +7,12 @@ class GameSchedule:
         self.__dates = self.__compute_dates(games)
         self.__games_by_pitch = self.__compute_games_by_pitch(games)
         self.__games_by_team = self.__compute_games_by_team(games)
+        self.__games_by_name = {game.name: game for game in games}
+        self.__games_by_id = {game.id: game for game in games}
+        self.__played_game_ids = set(game.id for game in games if game.result)
+
+        for game in games:
+            game.register(self)
 
     @property
     def dates(self):
@@ -31,6 +37,39 @@ class GameSchedule:
     def get_games_by_team(self, team):
         return self.__games_by_team[team]
 
+    def get_game_by_name(self, name):
+        """
+        @type name: str
+        @rtype: Game
+        """
+        return self.__games_by_name.get(name)
+
+    def get_game_by_id(self, identifier):
+        """
+        @type identifier: int
+        @rtype: Game
+        """
+        return self.__games_by_id.get(identifier)
+
+    @property
+    def number_of_results(self):
+        """
+        Get the number of games that have a result
+        @rtype: int
+        """
+        return len(self.__played_game_ids)
+
+    def update(self, observable):
+        """
+        Called by a game of this schedule when its result has changed
+        @type observable: Game
+        @return:
+        """
+        if observable.result:
+            self.__played_game_ids.add(observable.id)
+        else:
+            self.__played_game_ids.discard(observable.id)
+
     def get_max_gap_by_team(self, team, start_time, end_time):
         games = filter(lambda g: g.datetime.date() == start_time.date(), self.get_games_by_team(team))
         times = [start_time] + sorted(map(lambda g: g.datetime, games)) + [end_time]
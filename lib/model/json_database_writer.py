@@ -0,0 +1,43 @@
+class JsonDatabaseWriter:
+    # what comes before every section; the database has always been written with these, and an upload is only
+    # skipped when it is byte for byte the same as the last one
+    __separators = {"categories": "", "pools": ", ", "teams": ",", "fields": ", ", "referees": ",", "games": ","}
+
+    @staticmethod
+    def write(model):
+        """
+        Write the database as needed by the app in a single pass, joining the fragments of all entities at once
+        @type model: Model
+        @rtype: str
+        """
+        return JsonDatabaseWriter.join(JsonDatabaseWriter.get_fragments(model))
+
+    @staticmethod
+    def join(fragments):
+        """
+        Join the fragments of the entities into the database as needed by the app
+        @type fragments: list[tuple[str, list[tuple[int, str]]]]
+        @rtype: str
+        """
+        return "".join(["{0}\"{1}\": [{2}]".format(JsonDatabaseWriter.__separators[section], section,
+                                                   ",".join([fragment for _, fragment in entities]))
+                        for section, entities in fragments])
+
+    @staticmethod
+    def get_fragments(model):
+        """
+        Get the json fragment of every entity of the database, per section, together with the id of the entity
+        @type model: Model
+        @rtype: list[tuple[str, list[tuple[int, str]]]]
+        """
+        category_by_pool = model.category_by_pool
+        pool_by_game = model.pool_by_game
+
+        return [
+            ("categories", [(category.id, category.to_json()) for category in model.categories]),
+            ("pools", [(pool.id, pool.to_json(category_by_pool[pool])) for pool in model.relevant_pools]),
+            ("teams", [(team.id, team.to_json()) for team in model.teams]),
+            ("fields", [(pitch.id, pitch.to_json()) for pitch in model.pitches]),
+            ("referees", [(referee.id, referee.to_json()) for referee in model.referees]),
+            ("games", [(game.id, game.to_json(pool_by_game[game])) for game in model.games]),
+        ]
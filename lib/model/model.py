@@ -1,3 +1,9 @@
+from .change_set import ChangeSet
+from .json_database_writer import JsonDatabaseWriter
+from .observable import Observable
+from .pool import Pool
+
+
 class Model:
     def __init__(self):
         self.__categories = []
@@ -5,6 +11,7 @@ class Model:
         self.__referees = []
         self.__game_schedule = None
         self.__sponsors = []
+        self.__views = {}
 
     @property
     def categories(self):
@@ -15,6 +22,27 @@ class Model:
 
     def add_category(self, category):
         self.__categories.append(category)
+        self.__invalidate_views()
+
+    def add_pool(self, category, pool):
+        """
+        Add a pool to a category of this model
+        @type category: Category
+        @type pool: Pool
+        @return: None
+        """
+        category.add_pool(pool)
+        self.__invalidate_views()
+
+    def add_team(self, pool, team):
+        """
+        Add a team to a pool of this model
+        @type pool: Pool
+        @type team: Team
+        @return: None
+        """
+        pool.add_team(team)
+        self.__invalidate_views()
 
     @property
     def pitches(self):
@@ -29,38 +57,55 @@ class Model:
     @property
     def pools(self):
         """
-        @rtype: list[Pool]
+        @rtype: tuple[Pool]
         """
-        return [pool for category in self.categories for pool in category.pools]
+        return self.__get_view("pools", lambda: tuple(pool for category in self.categories for pool in category.pools))
 
     @property
     def all_pools(self):
         """
         Return all pools, both main pools and sub pools
-        @return:
+        @rtype: tuple[Pool]
         """
-        return [pool for category in self.categories
-                for main_pool in category.pools
-                for pool in ([main_pool] + main_pool.sub_pools if main_pool.sub_pools else [main_pool])
-                ]
+        return self.__get_view("all_pools", lambda: tuple(pool for main_pool in self.pools
+                                                          for pool in [main_pool] + main_pool.sub_pools))
 
     @property
     def relevant_pools(self):
         """
         Return pools or sub pools if a pool has those
-        @return:
+        @rtype: tuple[Pool]
         """
-        return [pool for category in self.categories
-                for main_pool in category.pools
-                for pool in (main_pool.sub_pools if main_pool.sub_pools else [main_pool])
-                ]
+        return self.__get_view("relevant_pools", lambda: tuple(pool for main_pool in self.pools
+                                                               for pool in (main_pool.sub_pools or [main_pool])))
 
     @property
     def teams(self):
         """
-        @rtype: list[Team]
+        @rtype: tuple[Team]
         """
-        return [team for pool in self.pools for team in pool.all_teams]
+        return self.__get_view("teams", lambda: tuple(team for pool in self.pools for team in pool.all_teams))
+
+    @property
+    def category_by_pool(self):
+        """
+        Get the category of every relevant pool. Do not modify the returned dict
+        @rtype: dict[Pool, Category]
+        """
+        return self.__get_view("category_by_pool", lambda: {pool: category
+                                                            for category in self.categories
+                                                            for main_pool in category.pools
+                                                            for pool in (main_pool.sub_pools or [main_pool])})
+
+    @property
+    def pool_by_game(self):
+        """
+        Get the pool (or sub pool) of every game. Do not modify the returned dict
+        @rtype: dict[Game, Pool]
+        """
+        return self.__get_view("pool_by_game", lambda: {game: pool
+                                                        for pool in self.all_pools
+                                                        for game in pool.own_games})
 
     @property
     def referees(self):
@@ -92,93 +137,140 @@ class Model:
     @game_schedule.setter
     def game_schedule(self, value):
         self.__game_schedule = value
+        self.__invalidate_views()
 
     @property
     def games(self):
         """
-        @rtype: list[Game]
+        @rtype: tuple[Game]
         """
-        return [game for game in self.game_schedule.games]
+        return self.__get_view("games", lambda: tuple(self.game_schedule.games))
+
+    def __get_view(self, name, compute):
+        """
+        Return the cached view with the given name, computing it first if needed
+        Views are cleared by every mutator that can change them
+        @type name: str
+        @rtype: tuple | dict
+        """
+        view = self.__views.get(name)
+        if view is None:
+            view = self.__views[name] = compute()
+        return view
+
+    def __invalidate_views(self):
+        self.__views = {}
+
+    def __getstate__(self):
+        # the views are cheap to rebuild and need not be persisted
+        state = self.__dict__.copy()
+        state["_Model__views"] = {}
+        return state
+
+    def batch_updates(self):
+        """
+        Context manager that postpones recomputing rankings and finals until the end of the block.
+        Each changed pool and final is then recomputed only once
+        @return:
+        """
+        return Observable.batch()
 
     def get_json_database(self):
         """
         Get the database as needed by the app
         @rtype: str
         """
-        category_by_pool = {pool: category
-                            for category in self.categories
-                            for main_pool in category.pools
-                            for pool in (main_pool.sub_pools if main_pool.sub_pools else [main_pool])}
-        pool_by_game = {game: pool
-                        for pool in self.all_pools
-                        for game in pool.own_games}
-
-        return "\"categories\": [{0}], " \
-               "\"pools\": [{1}]," \
-               "\"teams\": [{2}], " \
-               "\"fields\": [{3}]," \
-               "\"referees\": [{4}]," \
-               "\"games\": [{5}]".format(",".join(map(lambda c: c.to_json(), self.__categories)),
-                                         ",".join(map(lambda p: p.to_json(category_by_pool[p]), self.relevant_pools)),
-                                         ",".join(map(lambda t: t.to_json(), self.teams)),
-                                         ",".join(map(lambda p: p.to_json(), self.pitches)),
-                                         ",".join(map(lambda r: r.to_json(), self.referees)),
-                                         ",".join(map(lambda g: g.to_json(pool_by_game[g]), self.games)))
+        return JsonDatabaseWriter.write(self)
+
+    def get_json_database_fragments(self):
+        """
+        Get the json of every entity of the database as needed by the app, per section
+        @rtype: list[tuple[str, list[tuple[int, str]]]]
+        """
+        return JsonDatabaseWriter.get_fragments(self)
 
     def get_json_sponsors(self):
         return "\"sponsors\": [{0}]".format(",".join(map(lambda s: s.to_json(), self.__sponsors)))
 
-    def apply_new_game_results(self, all_game_results):
+    def apply_new_game_results(self, all_game_results, partial=False):
         """
         Update all games that have a new score
-        Returns the new results (indexed by id, rather than name!) and a flag indicating
-        that some final games are now known
+        Returns the new results (indexed by id, rather than name!), the finals that got
+        other teams and the pools of which the ranking has changed
         @type all_game_results: dict[str, GameResult]
-        @rtype: tuple[dict[int, GameResult], boolean]
+        @param partial: only the results that changed are given, with None for the results that were erased,
+        rather than all results
+        @type partial: bool
+        @rtype: ChangeSet
         """
 
         new_results = {}
 
-        final_game_teams_before = [(game.get_home_team_name(), game.get_away_team_name())
-                                   for pool in self.pools
-                                   for game in pool.finals]
+        # only look at the games in the result set; every game that has a result must be in there
+        games_and_results = [(self.game_schedule.get_game_by_name(name), new_result)
+                             for name, new_result in all_game_results.items()]
+        games_and_results = [(game, new_result) for game, new_result in games_and_results if game]
 
-        for game in self.game_schedule.games:
-            new_result = all_game_results.get(game.name, None)
-            if game.result and not new_result:
+        if partial:
+            if any(game.result and new_result is None for game, new_result in games_and_results):
                 raise Exception("Cannot erase a result; not supported by app")
-            elif game.result != new_result:
+        elif sum(1 for game, new_result in games_and_results if game.result and new_result) \
+                != self.game_schedule.number_of_results:
+            raise Exception("Cannot erase a result; not supported by app")
+
+        games_and_results = [(game, new_result) for game, new_result in games_and_results if game.result != new_result]
+
+        # a game is observed by its (sub) pool and by the pool that holds the finals depending on it
+        affected_pools = list(dict.fromkeys(observer for game, new_result in games_and_results
+                                            for observer in game.observers if isinstance(observer, Pool)))
+        affected_finals = [final for pool in affected_pools for final in pool.finals]
+
+        teams_before = [(final.home_team, final.away_team) for final in affected_finals]
+        rankings_before = [[r[0] for r in pool.compute_ranking()] for pool in affected_pools]
+
+        with self.batch_updates():
+            for game, new_result in games_and_results:
                 game.set_result(new_result)
                 new_results[game.id] = new_result
 
-        final_game_teams_after = [(game.get_home_team_name(), game.get_away_team_name())
-                                  for pool in self.pools
-                                  for game in pool.finals]
+        resolved_finals = [final for final, teams in zip(affected_finals, teams_before)
+                           if (final.home_team, final.away_team) != teams]
+        changed_rankings = [pool for pool, ranking in zip(affected_pools, rankings_before)
+                            if [r[0] for r in pool.compute_ranking()] != ranking]
 
-        return new_results, final_game_teams_before != final_game_teams_after
+        return ChangeSet(new_results, resolved_finals, changed_rankings)
 
     def apply_referees_and_juries(self, referees_and_juries):
-        referees_have_changed = False
-        juries_have_changed = False
+        """
+        Update the referees and jury of all games in the given dict (indexed by game name)
+        Returns the games of which the referees changed and the games of which the jury changed
+        @type referees_and_juries: dict[str, dict[str, str]]
+        @rtype: tuple[list[Game], list[Game]]
+        """
+        games_with_new_referees = []
+        games_with_new_jury = []
 
         referees_by_first_name = {referee.get_first_name(): referee for referee in self.referees}
 
-        for game in self.game_schedule.games:
+        for game_name, referees_and_jury in referees_and_juries.items():
+            game = self.game_schedule.get_game_by_name(game_name)
+            if not game:
+                continue
+
             old_referees = ([game.referee1] if game.referee1 else []) + ([game.referee2] if game.referee2 else [])
             new_referees = [referees_by_first_name[name]
-                            for name in referees_and_juries[game.name]["referees"].split(" ") if name and name != "en"]
+                            for name in referees_and_jury["referees"].split(" ") if name and name != "en"]
 
             if old_referees != new_referees:
                 new_referees += [None, None]
-                game.referee1 = new_referees[0]
-                game.referee2 = new_referees[1]
-                referees_have_changed = True
+                game.set_referees(new_referees[0], new_referees[1])
+                games_with_new_referees.append(game)
 
             old_jury = game.jury
-            new_jury = referees_and_juries[game.name]["jury"]
+            new_jury = referees_and_jury["jury"]
 
             if old_jury != new_jury:
                 game.jury = new_jury
-                juries_have_changed = True
+                games_with_new_jury.append(game)
 
-        return referees_have_changed, juries_have_changed
+        return games_with_new_referees, games_with_new_jury
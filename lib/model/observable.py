@@ -1,15 +1,83 @@
+from contextlib import contextmanager
+
+
 class Observable(object):
+    __slots__ = ("observers",)
+
+    # observers waiting to be refreshed at the end of the running batch (None when not batching)
+    __pending = None
+
     def __init__(self):
-        self.observers = []
+        # a tuple is smaller than a list, and observers hardly ever change after the schedule is built
+        self.observers = ()
 
     def register(self, observer):
         if not observer in self.observers:
-            self.observers.append(observer)
+            self.observers += (observer,)
 
     def unregister(self, observer):
         if observer in self.observers:
-            self.observers.remove(observer)
+            self.observers = tuple(o for o in self.observers if o is not observer)
 
     def update_observers(self):
         for observer in self.observers:
-            observer.update()
+            observer.update(self)
+
+    def refresh_later(self):
+        """
+        Mark this observer dirty when a batch is running, so that it is refreshed once at the end of it
+        Observers call this from update() and only refresh immediately when it returns False
+        @rtype: bool
+        """
+        if Observable.__pending is None:
+            return False
+
+        Observable.__pending[self] = None
+        return True
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Postpone refreshing observers until the end of the (outermost) batch.
+        At the end, every dirty observer is refreshed exactly once,
+        observables before the observers that depend on them
+        @return:
+        """
+        if Observable.__pending is not None:
+            yield
+            return
+
+        Observable.__pending = {}
+        try:
+            yield
+        finally:
+            try:
+                Observable.__flush()
+            finally:
+                Observable.__pending = None
+
+    @staticmethod
+    def __flush():
+        pending = Observable.__pending
+
+        # depth-first post order over the observer graph gives the reversed topological order
+        ordered = []
+        visited = set()
+        for observer in list(pending):
+            Observable.__visit(observer, visited, ordered)
+
+        # refreshing can mark observers further down the chain dirty; they come later in the order
+        for observer in reversed(ordered):
+            if observer in pending:
+                observer.refresh()
+
+    @staticmethod
+    def __visit(observable, visited, ordered):
+        if observable in visited:
+            return
+
+        visited.add(observable)
+        for observer in getattr(observable, "observers", []):
+            Observable.__visit(observer, visited, ordered)
+        ordered.append(observable)
@@ -1,8 +1,14 @@
+from lib.common.json_encoding import encode_string
+
+
 class Pitch:
+    __slots__ = ("id", "name", "rank", "__json")
+
     def __init__(self, identifier, name, rank):
         self.id = identifier
         self.name = name
         self.rank = rank
+        self.__json = None
 
     def __hash__(self):
         return hash(self.id)
@@ -10,9 +16,16 @@ class Pitch:
     def __eq__(self, other):
         return self.id == other.id
 
+    def __getstate__(self):
+        # the json fragment is rebuilt when it is needed, so snapshots leave it out
+        return None, {"id": self.id, "name": self.name, "rank": self.rank, "_Pitch__json": None}
+
     def to_json(self):
         """
         Convert to a json string as needed by the app
         @return: str
         """
-        return "{{\"id\": {0}, \"name\": \"{1}\", \"rank\": {2}}}".format(self.id, self.name, self.rank)
+        if self.__json is None:
+            self.__json = "{{\"id\": {0}, \"name\": {1}, \"rank\": {2}}}".format(self.id, encode_string(self.name),
+                                                                                self.rank)
+        return self.__json
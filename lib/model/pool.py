@@ -1,4 +1,6 @@
 from enum import Enum
+
+from lib.common.json_encoding import encode_string
 from .observable import Observable
 
 
@@ -24,6 +26,16 @@ class Pool(Observable):
         self.games = []
         self.finals = []
         self.rankings = []
+        self.__all_teams = None
+
+        # running (points, goals for, goals against) per team, updated on every new result
+        self.__tallies = {}
+        self.__counted_results = {}
+        self.__number_of_results = 0
+        self.__ranking = []
+        self.__ranking_is_dirty = True
+
+        self.__json = None
 
         if pool_type in [PoolType.split_with_finals, PoolType.split_with_semi_finals]:
             pool_a = factory.create_pool(name + " A", abbreviation + "A", PoolType.single_round_robin)
@@ -36,16 +48,32 @@ class Pool(Observable):
         else:
             self.sub_pools = []
 
+    def __getstate__(self):
+        # the json fragment is rebuilt when it is needed, so snapshots leave it out
+        state = self.__dict__.copy()
+        state["_Pool__json"] = None
+        return state, {"observers": self.observers}
+
     def add_team(self, team):
+        self.__all_teams = None
+
         if self.sub_pools:
             smaller = 0 if len(self.sub_pools[0].teams) <= len(self.sub_pools[1].teams) else 1
             self.sub_pools[smaller].add_team(team)
         else:
             self.teams.append(team)
+            self.__tallies[team] = (0, 0, 0)
+            self.__ranking_is_dirty = True
 
     @property
     def all_teams(self):
-        return self.teams + list(t for sp in self.sub_pools for t in sp.teams)
+        """
+        Return the teams of this pool and its sub pools
+        @rtype: tuple[Team]
+        """
+        if self.__all_teams is None:
+            self.__all_teams = tuple(self.teams + list(t for sp in self.sub_pools for t in sp.teams))
+        return self.__all_teams
 
     @property
     def own_games(self):
@@ -83,6 +111,7 @@ class Pool(Observable):
                                              len(self.sub_pools[home_sub_pool].games))
         else:
             self.games.append(game)
+            self.__counted_results[game] = None
             game.name = "{0}-{1:02d}".format(self.abbreviation, len(self.games))
 
         game.register(self)
@@ -93,13 +122,27 @@ class Pool(Observable):
 
         game.register(self)
 
-    def update(self):
+    def update(self, observable=None):
+        """
+        Count the result of the observed game if it is one of our pool games
+        and refresh the pool, or only mark it dirty while a batch is running
+        @type observable: Observable
+        @return:
+        """
+        if observable in self.__counted_results:
+            self.__count_result(observable)
+
+        if not self.refresh_later():
+            self.refresh()
+
+    def refresh(self):
         """
         Compute the ranking of this pool when all results are there.
-        Otherwise, do nothing
+        Otherwise, do nothing.
+        Afterwards, update the finals, which depend on the ranking and on each other
         @return:
         """
-        if self.games and all(game.result for game in self.games):
+        if self.games and self.__number_of_results == len(self.games):
             self.rankings = self.compute_ranking()
             self.update_observers()
 
@@ -108,19 +151,44 @@ class Pool(Observable):
                 final.update()
 
     def compute_ranking(self):
-        team_results = {team: (0, 0, 0) for team in self.teams}
-        for game in (game for game in self.games if game.result):
-            team_results[game.home_team] = tuple(map(lambda x, y: x + y,
-                                                     team_results[game.home_team],
-                                                     game.result.get_home_score()))
-            team_results[game.away_team] = tuple(map(lambda x, y: x + y,
-                                                     team_results[game.away_team],
-                                                     game.result.get_away_score()))
-
-        # add all results together (points, goal +, goal -)
-        # sort by point, saldo, goal +, name
-        return sorted(((team,) + results for team, results in team_results.items()),
-                      key=lambda t: (-t[1], t[3] - t[2], -t[2], t[0].name))
+        """
+        Return the ranking as a list of (Team, points, goals +, goals -) tuples.
+        The list is only sorted again when a result has changed since the last call
+        @rtype: list[tuple(Team, int, int, int)]
+        """
+        if self.__ranking_is_dirty:
+            # sort by point, saldo, goal +, name
+            self.__ranking = sorted(((team,) + tally for team, tally in self.__tallies.items()),
+                                    key=lambda t: (-t[1], t[3] - t[2], -t[2], t[0].name))
+            self.__ranking_is_dirty = False
+
+        return self.__ranking
+
+    def __count_result(self, game):
+        """
+        Replace the previously counted result of the game by its current result
+        @type game: Game
+        @return:
+        """
+        old_result = self.__counted_results[game]
+        if old_result == game.result:
+            return
+
+        if old_result:
+            self.__add_to_tallies(game, old_result, -1)
+            self.__number_of_results -= 1
+
+        if game.result:
+            self.__add_to_tallies(game, game.result, 1)
+            self.__number_of_results += 1
+
+        self.__counted_results[game] = game.result
+        self.__ranking_is_dirty = True
+
+    def __add_to_tallies(self, game, game_result, sign):
+        for team, score in ((game.home_team, game_result.get_home_score()),
+                            (game.away_team, game_result.get_away_score())):
+            self.__tallies[team] = tuple(x + sign * y for x, y in zip(self.__tallies[team], score))
 
     def get_ranked_team(self, rank):
         return self.rankings[rank - 1][0] if self.rankings else None
@@ -129,7 +197,7 @@ class Pool(Observable):
         return hash(self.id)
 
     def __eq__(self, other):
-        return other and self.id == other.id
+        return isinstance(other, Pool) and self.id == other.id
 
     def to_json(self, category):
         """
@@ -137,11 +205,17 @@ class Pool(Observable):
         @type category: Category
         @return: str
         """
-        return "{{\"id\": {0}, " \
-               "\"name\": \"{1}\", " \
-               "\"abbreviation\": \"{2}\", " \
-               "\"category\": {3}, " \
-               "\"rank\": {4}}}".format(self.id, self.name, self.abbreviation, category.id, self.rank)
+        if self.__json is None:
+            self.__json = "{{\"id\": {0}, " \
+                          "\"name\": {1}, " \
+                          "\"abbreviation\": {2}, " \
+                          "\"category\": {3}, " \
+                          "\"rank\": {4}}}".format(self.id,
+                                                    encode_string(self.name),
+                                                    encode_string(self.abbreviation),
+                                                    category.id,
+                                                    self.rank)
+        return self.__json
 
 
 class PoolType(Enum):
@@ -1,7 +1,13 @@
+from lib.common.json_encoding import encode_string
+
+
 class Referee:
+    __slots__ = ("id", "name", "__json")
+
     def __init__(self, identifier, name):
         self.id = identifier
         self.name = name
+        self.__json = None
 
     def get_first_name(self):
         return self.name.split(" ")[0];
@@ -12,9 +18,15 @@ class Referee:
     def __eq__(self, other):
         return other and self.id == other.id
 
+    def __getstate__(self):
+        # the json fragment is rebuilt when it is needed, so snapshots leave it out
+        return None, {"id": self.id, "name": self.name, "_Referee__json": None}
+
     def to_json(self):
         """
         Convert to a json string as needed by the app
         @return: str
         """
-        return "{{\"id\": {0}, \"name\": \"{1}\"}}".format(self.id, self.name)
+        if self.__json is None:
+            self.__json = "{{\"id\": {0}, \"name\": {1}}}".format(self.id, encode_string(self.name))
+        return self.__json
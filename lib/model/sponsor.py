@@ -1,4 +1,9 @@
+from lib.common.json_encoding import encode_string
+
+
 class Sponsor:
+    __slots__ = ("id", "name", "uri")
+
     def __init__(self, identifier, name, uri):
         self.id = identifier
         self.name = name
@@ -15,4 +20,6 @@ class Sponsor:
         Convert to a json string as needed by the app
         @return: str
         """
-        return "{{\"sponsorId\": {0}, \"name\": \"{1}\", \"uri\": \"{2}\"}}".format(self.id, self.name, self.uri)
+        return "{{\"sponsorId\": {0}, \"name\": {1}, \"uri\": {2}}}".format(self.id,
+                                                                           encode_string(self.name),
+                                                                           encode_string(self.uri))
@@ -1,4 +1,6 @@
 class TemplateGame:
+    __slots__ = ("id", "pitch", "datetime", "pool")
+
     def __init__(self, identifier, pitch, datetime, pool):
         self.id = identifier
         self.pitch = pitch
@@ -0,0 +1,175 @@
+import base64
+import gzip
+import json
+import socket
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class LocalServer:
+    def __init__(self, password, port=0):
+        """
+        A local stand-in for the upload script of the app server, for tests and benchmarks.
+        It keeps everything that is uploaded in memory
+        @type password: str
+        @type port: int
+        @rtype: None
+        """
+        self.password = password
+        self.database = None
+        self.results = {}
+        self.sponsors = None
+        self.messages = []
+        self.uploads = []
+
+        # fault injection: the delay before every response, and the number of upcoming requests to fail
+        self.latency = 0.0
+        self.failures = 0
+        self.failure_status = 503
+        # the Retry-After header of the failed responses, in seconds; None leaves it out
+        self.retry_after = None
+        self.connections = 0
+        self.received_bytes = 0
+
+        self.__lock = threading.Lock()
+        self.__open_connections = set()
+        self.__server = ThreadingHTTPServer(("127.0.0.1", port), self.__create_request_handler())
+        self.__thread = None
+
+    @property
+    def url(self):
+        """
+        @rtype: str
+        """
+        return "http://127.0.0.1:{0}/upload.php".format(self.__server.server_address[1])
+
+    def start(self):
+        """
+        Serve requests on a background thread
+        @rtype: LocalServer
+        """
+        self.__thread = threading.Thread(target=self.__server.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+
+        # also end the keep-alive connections, which would otherwise go on being served
+        for connection in list(self.__open_connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        self.__server.server_close()
+        self.__thread.join()
+
+    def handle_upload(self, fields):
+        """
+        Handle the form fields of one upload the way the app server does
+        Returns the status, the response text and the extra headers of the response
+        @type fields: dict[str, str]
+        @rtype: tuple[int, str, dict[str, str]]
+        """
+        time.sleep(self.latency)
+
+        with self.__lock:
+            if self.failures > 0:
+                self.failures -= 1
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return self.failure_status, "Injected failure", headers
+
+        status, text = self.__handle_upload(fields)
+        return status, text, {}
+
+    def __handle_upload(self, fields):
+        """
+        @type fields: dict[str, str]
+        @rtype: tuple[int, str]
+        """
+
+        if fields.get("password") != self.password:
+            return 403, "Wrong password"
+
+        upload_type = fields.get("type")
+        data = fields.get("data", "")
+
+        encoding = fields.get("encoding")
+        if encoding == "gzip-base64url":
+            data = gzip.decompress(base64.urlsafe_b64decode(data)).decode("utf-8")
+        elif encoding:
+            return 400, "Unknown encoding"
+
+        with self.__lock:
+            self.uploads.append(upload_type)
+            self.received_bytes += len(fields.get("data", ""))
+
+            if upload_type == "database":
+                self.database = {section: {entity["id"]: entity for entity in entities}
+                                 for section, entities in json.loads("{" + data + "}").items()}
+            elif upload_type == "database_delta":
+                if self.database is None:
+                    return 409, "No database to apply the delta to"
+
+                delta = json.loads("{" + data + "}")
+                for section, identifiers in delta.pop("removed", {}).items():
+                    for identifier in identifiers:
+                        self.database[section].pop(identifier, None)
+                for section, entities in delta.items():
+                    self.database[section].update({entity["id"]: entity for entity in entities})
+            elif upload_type == "results":
+                self.results.update({result["gameId"]: result for result in json.loads("[" + data + "]")})
+            elif upload_type == "sponsors":
+                self.sponsors = json.loads("{" + data + "}")["sponsors"]
+            elif upload_type == "message":
+                self.messages.append(json.loads(data))
+            else:
+                return 400, "Unknown upload type"
+
+        return 200, "OK"
+
+    def __create_request_handler(self):
+        server = self
+        open_connections = self.__open_connections
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                server.connections += 1
+                open_connections.add(self.connection)
+
+            def finish(self):
+                open_connections.discard(self.connection)
+                BaseHTTPRequestHandler.finish(self)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                fields = {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+                status, text, headers = server.handle_upload(fields)
+
+                response = text.encode("utf-8")
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "text/plain")
+                    self.send_header("Content-Length", str(len(response)))
+                    self.end_headers()
+                    self.wfile.write(response)
+                except ConnectionError:
+                    # the client gave up waiting, e.g. because of the injected latency
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
@@ -1,18 +1,126 @@
+import base64
 import datetime
+import gzip
+import hashlib
+import json
+import os
 import requests
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 
 from lib.model.game_result import GameResult
+from lib.model.json_database_writer import JsonDatabaseWriter
 from lib.model.model import Model
 
-from .password import password
+
+
+class UploadError(Exception):
+    def __init__(self, status_code, text):
+        """
+        The server answered an upload with an error
+        @type status_code: int
+        @type text: str
+        @rtype: None
+        """
+        Exception.__init__(self, "Upload failed! Error code {0}. Response: {1}".format(status_code, text))
+        self.status_code = status_code
 
 
 class UploadHandler:
     results_url = "https://app.sbctoernooien.nl/upload.php"
-    password = password
 
-    def __init__(self):
-        pass
+    # a keep-alive session per thread by thread id, shared by every handler, so the connection and TLS handshake
+    # are reused; requests does not promise that a session can be used by several threads at once
+    __sessions = {}
+    __sessions_lock = threading.Lock()
+
+    # the value of the "encoding" field of a compressed upload; url-safe base64 is not inflated by form encoding
+    compressed_encoding = "gzip-base64url"
+
+    # smaller payloads are sent as they are; compressing them does not pay off
+    __compression_threshold = 1024
+
+    def __init__(self, folder=None, url=None, delta_uploads=False, timeout=(5, 30), retries=3, backoff=0.5,
+                 compress=False, password=None):
+        """
+        @param folder: where to keep the state of the last successful uploads; None keeps it in memory only
+        @type folder: str
+        @param url: the url to upload to, instead of the app server
+        @type url: str
+        @param delta_uploads: only upload the entities of the database that changed since the last
+                              successful upload; the server must support "database_delta" uploads
+        @type delta_uploads: bool
+        @param timeout: the connect and read timeout of a single attempt, in seconds
+        @type timeout: tuple[float, float]
+        @param retries: how often to retry an upload after a transient error
+        @type retries: int
+        @param backoff: the delay before the first retry, in seconds; doubled on every next retry
+        @type backoff: float
+        @param compress: gzip the data of larger uploads; the server must support the "encoding" field
+        @type compress: bool
+        @param password: the password of the server to upload to; the password of the app server by default
+        @type password: str
+        @rtype: None
+        """
+        self.__state_file_name = os.path.join(folder, "upload_state.json") if folder else None
+        self.__metrics_file_name = os.path.join(folder, "upload_metrics.log") if folder else None
+        self.__state = None
+        self.__state_lock = threading.Lock()
+        self.__metrics_lock = threading.Lock()
+        self.__url = url or self.results_url
+        self.__delta_uploads = delta_uploads
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__compress = compress
+        self.password = password if password is not None else self.get_app_password()
+
+    @staticmethod
+    def get_app_password():
+        """
+        The password of the app server, which is not part of the repository
+        @rtype: str
+        """
+        from .password import password
+        return password
+
+    @staticmethod
+    def upload_concurrently(uploads, max_workers=4, executor=None):
+        """
+        Make independent uploads at the same time, at most max_workers at once, and wait for all of them.
+        Returns the exception of every upload that failed, or None if it succeeded, in the order of the uploads
+        @param uploads: functions that each make an upload, e.g. lambda: upload_handler.upload_results(results)
+        @type uploads: list[callable]
+        @type max_workers: int
+        @param executor: the threads to upload on, instead of new ones; the sessions of its threads are kept, so
+        later uploads on it reuse their connections
+        @type executor: concurrent.futures.ThreadPoolExecutor
+        @rtype: list[Exception]
+        """
+        def upload(function):
+            try:
+                function()
+            except Exception as e:
+                return e
+
+        if executor is not None:
+            return list(executor.map(upload, uploads))
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(upload, uploads))
+
+    @classmethod
+    def close_sessions(cls):
+        """
+        Close the sessions of all threads and their connections, once no uploads are being made
+        @rtype: None
+        """
+        with cls.__sessions_lock:
+            sessions, cls.__sessions = list(cls.__sessions.values()), {}
+        for session in sessions:
+            session.close()
 
     def upload_results(self, results):
         """
@@ -23,30 +131,87 @@ class UploadHandler:
 
         self.__upload({"type": "results", "data": upload_string})
 
-    def upload_database(self, model):
+    def upload_database(self, model, force=False):
         """
         @type model: Model
+        @param force: upload even when the server should have this database already
+        @type force: bool
+        @rtype: None
+        """
+        if self.__delta_uploads:
+            self.upload_database_fragments(model.get_json_database_fragments(), force)
+        else:
+            self.upload_json_database(model.get_json_database(), force)
+
+    def upload_database_fragments(self, fragments, full_resync=False):
+        """
+        Upload only the entities that were added, changed or removed since the last successful upload.
+        Everything is uploaded when delta uploads are off, when there is no previous upload,
+        when the delta is rejected, or on request
+        @type fragments: list[tuple[str, list[tuple[int, str]]]]
+        @type full_resync: bool
         @rtype: None
         """
-        upload_string = model.get_json_database()
+        hashes = {section: {str(identifier): hashlib.sha1(fragment.encode("utf-8")).hexdigest()
+                            for identifier, fragment in entities}
+                  for section, entities in fragments}
+        previous_hashes = self.__get_state().get("database")
 
-        self.__upload({"type": "database", "data": upload_string})
+        if previous_hashes is not None and self.__delta_uploads and not full_resync:
+            upload_string = self.__create_delta_upload_string(fragments, hashes, previous_hashes)
+            try:
+                if upload_string:
+                    self.__upload({"type": "database_delta", "data": upload_string})
+                self.__set_state("database", hashes)
+                # the server no longer has the database of the last full upload
+                self.__set_state("database_fingerprint", None)
+                return
+            except UploadError as e:
+                # only when the server rejects the delta, for example because it lost its database,
+                # a full upload can help; other errors would hit the full upload just the same
+                if e.status_code // 100 != 4 or e.status_code == 429:
+                    raise
+                full_resync = True
 
-    def upload_sponsors(self, model):
+        self.upload_json_database(JsonDatabaseWriter.join(fragments), full_resync)
+        self.__set_state("database", hashes)
+
+    def upload_json_database(self, json_database, force=False):
+        """
+        Upload the database, unless it is the same as the last one uploaded
+        @type json_database: str
+        @type force: bool
+        @rtype: None
+        """
+        if self.__upload_if_changed("database", json_database, force):
+            # the entities of the last delta upload are no longer what the server has
+            self.__set_state("database", None)
+
+    def upload_sponsors(self, model, force=False):
         """
         @type model: Model
+        @type force: bool
         @rtype: None
         """
-        upload_string = model.get_json_sponsors()
+        self.upload_json_sponsors(model.get_json_sponsors(), force)
 
-        self.__upload({"type": "sponsors", "data": upload_string})
+    def upload_json_sponsors(self, json_sponsors, force=False):
+        """
+        Upload the sponsors, unless they are the same as the last ones uploaded
+        @type json_sponsors: str
+        @type force: bool
+        @rtype: None
+        """
+        self.__upload_if_changed("sponsors", json_sponsors, force)
 
-    def upload_message(self, title, message):
+    def upload_message(self, title, message, now=None):
         """
         @type message: str
+        @param now: the time the message was written; defaults to the current time
+        @type now: datetime.datetime
         @return: None
         """
-        now = datetime.datetime.now()
+        now = now or datetime.datetime.now()
         upload_string = "{{\"id\": {0}, \"title\": \"{1}\", \"message\": \"{2}\", \"date\": \"{3}\"}}".format(
             now.strftime("%Y%m%d%H%M%S"),
             title,
@@ -61,11 +226,149 @@ class UploadHandler:
         @type data: dict[str, str]
         @rtype: None
         """
+        payload = data["data"].encode("utf-8")
+        metrics = {"type": data["type"], "size": len(payload), "encoded_size": len(payload)}
+
+        if self.__compress and len(payload) >= self.__compression_threshold:
+            data["data"] = base64.urlsafe_b64encode(gzip.compress(payload, 6)).decode("ascii")
+            data["encoding"] = self.compressed_encoding
+            metrics["encoded_size"] = len(data["data"])
+
         data["password"] = self.password
-        r = requests.post(self.results_url, data)
 
-        if r.status_code // 100 != 2:
-            raise Exception("Upload failed! Error code {0}. Response: {1}".format(r.status_code, r.text))
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.__retries + 1):
+                delay = self.__backoff * 2 ** attempt
+                metrics["attempts"] = attempt + 1
+
+                try:
+                    attempt_start = time.perf_counter()
+                    r = self.__get_session().post(self.__url, data, timeout=self.__timeout)
+                    metrics["round_trip"] = time.perf_counter() - attempt_start
+                    metrics["status"] = r.status_code
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    metrics["status"] = type(e).__name__
+                    if attempt == self.__retries:
+                        raise
+                else:
+                    if r.status_code // 100 == 2:
+                        return
+                    if (r.status_code // 100 != 5 and r.status_code != 429) or attempt == self.__retries:
+                        raise UploadError(r.status_code, r.text)
+
+                    retry_after = r.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = max(delay, int(retry_after))
+
+                time.sleep(delay)
+        finally:
+            metrics["total_time"] = time.perf_counter() - start
+            self.__record_metrics(metrics)
+
+    def __record_metrics(self, metrics):
+        """
+        Append the sizes and timings of an upload to the metrics log, one json object per line
+        @type metrics: dict
+        @rtype: None
+        """
+        if not self.__metrics_file_name:
+            return
+
+        metrics["time"] = datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        # concurrent uploads record their metrics from several threads
+        with self.__metrics_lock:
+            with open(self.__metrics_file_name, "a") as metrics_file:
+                metrics_file.write(json.dumps(metrics) + "\n")
+
+    def __upload_if_changed(self, upload_type, data, force):
+        """
+        Upload data that replaces everything of its type on the server, unless the last successful upload of that type
+        had exactly the same data; the fingerprint of that upload is kept in the upload state.
+        Returns whether the data was uploaded
+        @type upload_type: str
+        @type data: str
+        @type force: bool
+        @rtype: bool
+        """
+        key = upload_type + "_fingerprint"
+        fingerprint = hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+        if not force and self.__get_state().get(key) == fingerprint:
+            return False
+
+        self.__upload({"type": upload_type, "data": data})
+        self.__set_state(key, fingerprint)
+        return True
+
+    @classmethod
+    def __get_session(cls):
+        """
+        Get the session of the current thread
+        @rtype: requests.Session
+        """
+        thread_id = threading.get_ident()
+        with cls.__sessions_lock:
+            session = cls.__sessions.get(thread_id)
+            if session is None:
+                session = cls.__sessions[thread_id] = requests.Session()
+
+        return session
+
+    def __get_state(self):
+        """
+        Get the state of the last successful uploads
+        @rtype: dict
+        """
+        if self.__state is None:
+            self.__state = {}
+            if self.__state_file_name and os.path.exists(self.__state_file_name):
+                with open(self.__state_file_name, "r") as state_file:
+                    self.__state = json.load(state_file)
+
+        return self.__state
+
+    def __set_state(self, key, value):
+        # concurrent uploads each set their own key; the lock keeps them from writing the file at the same time
+        with self.__state_lock:
+            self.__get_state()[key] = value
+
+            if self.__state_file_name:
+                temporary_file_name = self.__state_file_name + ".tmp"
+                with open(temporary_file_name, "w") as state_file:
+                    json.dump(self.__state, state_file)
+                os.replace(temporary_file_name, self.__state_file_name)
+
+    @staticmethod
+    def __create_delta_upload_string(fragments, hashes, previous_hashes):
+        """
+        Create the upload string of all added or changed entities, plus the ids of the removed entities
+        Returns an empty string when nothing has changed
+        @type fragments: list[tuple[str, list[tuple[int, str]]]]
+        @type hashes: dict[str, dict[str, str]]
+        @type previous_hashes: dict[str, dict[str, str]]
+        @rtype: str
+        """
+        changed_sections = []
+        removed_sections = []
+
+        for section, entities in fragments:
+            section_hashes = hashes[section]
+            previous_section_hashes = previous_hashes.get(section, {})
+
+            changed = [fragment for identifier, fragment in entities
+                       if previous_section_hashes.get(str(identifier)) != section_hashes[str(identifier)]]
+            removed = [identifier for identifier in previous_section_hashes if identifier not in section_hashes]
+
+            if changed:
+                changed_sections.append("\"{0}\": [{1}]".format(section, ",".join(changed)))
+            if removed:
+                removed_sections.append("\"{0}\": [{1}]".format(section, ",".join(removed)))
+
+        if not changed_sections and not removed_sections:
+            return ""
+
+        return ", ".join(changed_sections + ["\"removed\": {{{0}}}".format(", ".join(removed_sections))])
 
     def __create_results_upload_string(self, game_results):
         """
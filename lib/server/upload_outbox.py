@@ -0,0 +1,535 @@
+import argparse
+import datetime
+import functools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.model.game_result import GameResult
+from lib.model.model import Model
+
+from .upload_handler import UploadHandler
+
+
+class UploadOutbox:
+    # a database upload replaces the whole database in the app, so it supersedes every pending one
+    __database_job_types = ("database", "json_database")
+
+    # the worker touches its lock file every few seconds; a lock that is not touched for a while is abandoned
+    __heartbeat_interval = 5
+    __stale_lock_age = 30
+
+    # a job that keeps failing is set aside after this many attempts, so that it does not block the rest
+    __max_attempts = 10
+
+    # queued jobs that wait longer than this are reported; the app server seems to be unreachable, in seconds
+    __overdue_job_age = 300
+
+    # jobs of these kinds are never sent at the same time as each other; see __get_batch
+    __sequential_kinds = ("results", "database")
+
+    # the number of jobs the worker sends at the same time
+    __max_concurrent_uploads = 4
+
+    def __init__(self, folder, url=None, delta_uploads=False, compress=False, results_window=2.0,
+                 start_worker=True):
+        """
+        A durable queue of uploads on disk. The upload methods only queue a job and return immediately;
+        a worker process sends the jobs in order, and picks up where it left off after a restart
+        @param folder: the outbox is kept in a subfolder of this folder, next to the state of the last uploads
+        @type folder: str
+        @param url: the url to upload to, instead of the app server
+        @type url: str
+        @param delta_uploads: see UploadHandler
+        @type delta_uploads: bool
+        @param compress: see UploadHandler
+        @type compress: bool
+        @param results_window: how long the worker holds back queued results after it sent results, in seconds;
+                               results queued in the meantime are merged, so that quick successive runs make one
+                               upload, while results queued after a quiet spell go out at once
+        @type results_window: float
+        @param start_worker: start a worker process after queueing a job, if none is running
+        @type start_worker: bool
+        @rtype: None
+        """
+        self.__folder = folder
+        self.__outbox_folder = os.path.join(folder, "outbox")
+        self.__failed_folder = os.path.join(self.__outbox_folder, "failed")
+        self.__lock_file_name = os.path.join(self.__outbox_folder, "worker.lock")
+        self.__log_file_name = os.path.join(self.__outbox_folder, "worker.log")
+        self.__url = url
+        self.__delta_uploads = delta_uploads
+        self.__compress = compress
+        self.__results_window = results_window
+        # when the worker last sent results
+        self.__last_results_sent = 0.0
+        self.__start_worker = start_worker
+        # what this worker wrote to the lock file when it took the lock
+        self.__lock_content = None
+
+    def upload_results(self, results):
+        """
+        @type results: dict[int, GameResult]
+        @rtype: None
+        """
+        self.__enqueue("results", {"results": {str(identifier): [result.home_score, result.away_score]
+                                               for identifier, result in results.items()}})
+
+    def upload_database(self, model, force=False):
+        """
+        @type model: Model
+        @type force: bool
+        @rtype: None
+        """
+        # the fragments are queued rather than the database, so the delta is taken against the state at send time
+        self.__enqueue("database", {"fragments": model.get_json_database_fragments(), "force": force})
+
+    def upload_json_database(self, json_database, force=False):
+        """
+        @type json_database: str
+        @type force: bool
+        @rtype: None
+        """
+        self.__enqueue("json_database", {"data": json_database, "force": force})
+
+    def upload_sponsors(self, model, force=False):
+        """
+        @type model: Model
+        @type force: bool
+        @rtype: None
+        """
+        self.upload_json_sponsors(model.get_json_sponsors(), force)
+
+    def upload_json_sponsors(self, json_sponsors, force=False):
+        """
+        @type json_sponsors: str
+        @type force: bool
+        @rtype: None
+        """
+        self.__enqueue("json_sponsors", {"data": json_sponsors, "force": force})
+
+    def upload_message(self, title, message):
+        """
+        @type title: str
+        @type message: str
+        @rtype: None
+        """
+        self.__enqueue("message", {"title": title, "message": message, "time": time.time()})
+
+    def get_pending_jobs(self):
+        """
+        Get the file names of all queued jobs, in the order in which they will be sent
+        @rtype: list[str]
+        """
+        if not os.path.isdir(self.__outbox_folder):
+            return []
+
+        # the sequence number leads the file name; a job that was being sent when the worker stopped goes first
+        return sorted(file_name for file_name in os.listdir(self.__outbox_folder)
+                      if file_name.endswith(".job") or file_name.endswith(".sending"))
+
+    def get_problems(self):
+        """
+        Describe the uploads that need the attention of the operator: jobs that were set aside after failing too
+        often, and jobs that have been waiting for long. Returns None when there are none
+        @rtype: str
+        """
+        problems = []
+
+        failed_jobs = os.listdir(self.__failed_folder) if os.path.isdir(self.__failed_folder) else []
+        if failed_jobs:
+            problems.append("{0} upload(s) failed too often and were set aside in {1}; see {2} and remove them "
+                            "once they are handled".format(len(failed_jobs), self.__failed_folder,
+                                                           self.__log_file_name))
+
+        # the sequence number of a job is the time it was queued, in nanoseconds
+        now = time.time_ns()
+        overdue_jobs = [file_name for file_name in self.get_pending_jobs()
+                        if now - int(file_name.split("-")[0]) > self.__overdue_job_age * 10 ** 9]
+        if overdue_jobs:
+            problems.append("{0} upload(s) have been waiting for more than {1} minutes; see {2}".format(
+                len(overdue_jobs), self.__overdue_job_age // 60, self.__log_file_name))
+
+        return "\n".join(problems) or None
+
+    def is_worker_running(self):
+        """
+        @rtype: bool
+        """
+        try:
+            return time.time() - os.path.getmtime(self.__lock_file_name) < self.__stale_lock_age
+        except OSError:
+            return False
+
+    def start_worker(self):
+        """
+        Start a worker process that is detached from Excel, unless one is running already
+        @rtype: None
+        """
+        if self.is_worker_running():
+            return
+
+        arguments = [sys.executable, "-m", "lib.server.upload_outbox", self.__folder]
+        if self.__url:
+            arguments += ["--url", self.__url]
+        if self.__delta_uploads:
+            arguments += ["--delta-uploads"]
+        if self.__compress:
+            arguments += ["--compress"]
+        arguments += ["--results-window", str(self.__results_window)]
+
+        if os.name == "nt":
+            options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW}
+        else:
+            options = {"start_new_session": True}
+
+        subprocess.Popen(arguments, cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         close_fds=True, **options)
+
+    def run(self, idle_timeout=300.0, poll_interval=0.5):
+        """
+        Send the queued jobs in order, until the outbox has been empty for idle_timeout seconds.
+        Returns immediately when another worker is running
+        @type idle_timeout: float
+        @type poll_interval: float
+        @rtype: None
+        """
+        while self.__acquire_lock():
+            self.__send_jobs(idle_timeout, poll_interval)
+
+            # a job that was queued while this worker was about to stop saw the lock and started no worker;
+            # jobs are written before the lock is checked, so they are always seen here
+            if not self.get_pending_jobs():
+                return
+
+    def __send_jobs(self, idle_timeout, poll_interval):
+        """
+        Send the queued jobs while holding the lock, and release it once the outbox has been empty for a while
+        @type idle_timeout: float
+        @type poll_interval: float
+        @rtype: None
+        """
+        stopped = threading.Event()
+        heartbeat = threading.Thread(target=self.__beat, args=(stopped,))
+        heartbeat.daemon = True
+        heartbeat.start()
+
+        # the same threads send every batch, so that they keep their connections to the server
+        executor = ThreadPoolExecutor(self.__max_concurrent_uploads)
+
+        try:
+            upload_handler = UploadHandler(self.__folder, self.__url, self.__delta_uploads, compress=self.__compress)
+            idle_since = time.time()
+            failing_job = None
+            attempts = 0
+
+            while True:
+                jobs = self.get_pending_jobs()
+                if not jobs:
+                    if time.time() - idle_since >= idle_timeout:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+
+                batch = self.__get_batch(jobs)
+                if not batch:
+                    time.sleep(poll_interval)
+                    continue
+
+                errors = upload_handler.upload_concurrently(
+                    [functools.partial(self.__send, file_name, upload_handler) for file_name in batch],
+                    executor=executor)
+
+                # the jobs after the first failure that did fail as well are simply tried again
+                for file_name, error in zip(batch, errors):
+                    if error is None:
+                        continue
+
+                    job_name = file_name.rsplit(".", 1)[0]
+                    attempts = attempts + 1 if job_name == failing_job else 1
+                    failing_job = job_name
+                    self.__log("{0} failed (attempt {1}): {2!r}".format(job_name, attempts, error))
+
+                    if attempts >= self.__max_attempts:
+                        self.__set_aside(job_name)
+                        attempts = 0
+                    else:
+                        time.sleep(min(60, 2 ** attempts))
+                    break
+
+                idle_since = time.time()
+        finally:
+            executor.shutdown()
+            UploadHandler.close_sessions()
+            stopped.set()
+            heartbeat.join()
+            self.__release_lock()
+
+    def __enqueue(self, job_type, job):
+        """
+        Write a job to the outbox. A database job removes all pending database jobs it supersedes;
+        results are merged into the last queued job when that holds results too
+        @type job_type: str
+        @type job: dict
+        @rtype: None
+        """
+        os.makedirs(self.__outbox_folder, exist_ok=True)
+
+        pending_jobs = self.get_pending_jobs()
+        superseded_jobs = []
+
+        if job_type in self.__database_job_types:
+            superseded_jobs = [file_name for file_name in pending_jobs if file_name.endswith(".job")
+                               and self.__get_job_type(file_name) in self.__database_job_types]
+
+            # a forced upload stays forced when a newer database takes its place
+            for file_name in superseded_jobs:
+                try:
+                    with open(os.path.join(self.__outbox_folder, file_name), "r") as job_file:
+                        job["force"] = job["force"] or json.load(job_file).get("force", False)
+                except FileNotFoundError:
+                    pass
+        elif job_type == "results" and pending_jobs and pending_jobs[-1].endswith("-results.job"):
+            # only the last job qualifies: results merged into a job before a database job would be overwritten
+            # in the app by the older results in that database
+            try:
+                with open(os.path.join(self.__outbox_folder, pending_jobs[-1]), "r") as job_file:
+                    previous_job = json.load(job_file)
+            except FileNotFoundError:
+                # the worker has just claimed it
+                pass
+            else:
+                previous_job["results"].update(job["results"])
+                job = previous_job
+                superseded_jobs = [pending_jobs[-1]]
+
+        # nanoseconds keep the order across processes; the previous job bounds it in case the clock is coarse
+        sequence = time.time_ns()
+        if pending_jobs:
+            sequence = max(sequence, int(pending_jobs[-1].split("-")[0]) + 1)
+
+        job["type"] = job_type
+        job_file_name = os.path.join(self.__outbox_folder, "{0:020d}-{1}.job".format(sequence, job_type))
+
+        # write to a temporary file first, so that the worker never reads a half-written job
+        temporary_file_name = job_file_name + ".tmp"
+        with open(temporary_file_name, "w") as job_file:
+            json.dump(job, job_file)
+        os.replace(temporary_file_name, job_file_name)
+
+        # the new job is written under a later sequence number first, so that it is never sent before a superseded
+        # job that the worker claims in the meantime
+        for file_name in superseded_jobs:
+            try:
+                os.remove(os.path.join(self.__outbox_folder, file_name))
+            except FileNotFoundError:
+                pass
+
+        if self.__start_worker:
+            self.start_worker()
+
+    def __get_batch(self, jobs):
+        """
+        Get the leading jobs that can be sent at the same time: jobs that are due, each of another kind.
+        Results and databases are never sent together: results must be in the app before a later database is
+        uploaded, and a database ahead of results could overwrite them in the app with its older results
+        @type jobs: list[str]
+        @rtype: list[str]
+        """
+        batch = []
+        kinds = set()
+
+        for file_name in jobs[:self.__max_concurrent_uploads]:
+            job_type = self.__get_job_type(file_name)
+            kind = "database" if job_type in self.__database_job_types else job_type
+
+            sequential = kind in self.__sequential_kinds and kinds.intersection(self.__sequential_kinds)
+            if kind in kinds or sequential or not self.__is_due(file_name):
+                break
+
+            batch.append(file_name)
+            kinds.add(kind)
+
+        return batch
+
+    def __is_due(self, file_name):
+        """
+        Results are held back until the results window after the last results that were sent has passed,
+        other jobs are due at once
+        @type file_name: str
+        @rtype: bool
+        """
+        if not file_name.endswith("-results.job"):
+            return True
+
+        return time.time() - self.__last_results_sent >= self.__results_window
+
+    @staticmethod
+    def __get_job_type(file_name):
+        """
+        @type file_name: str
+        @rtype: str
+        """
+        return file_name.rsplit(".", 1)[0].split("-")[1]
+
+    def __send(self, file_name, upload_handler):
+        """
+        Claim a job by renaming it, send it and remove it
+        @type file_name: str
+        @type upload_handler: UploadHandler
+        @rtype: None
+        """
+        sending_file_name = os.path.join(self.__outbox_folder, file_name.rsplit(".", 1)[0] + ".sending")
+        try:
+            os.replace(os.path.join(self.__outbox_folder, file_name), sending_file_name)
+        except FileNotFoundError:
+            # superseded by a newer database job in the meantime
+            return
+
+        with open(sending_file_name, "r") as job_file:
+            job = json.load(job_file)
+
+        if job["type"] == "results":
+            upload_handler.upload_results({int(identifier): GameResult(home_score, away_score)
+                                           for identifier, (home_score, away_score) in job["results"].items()})
+            self.__last_results_sent = time.time()
+        elif job["type"] == "database":
+            upload_handler.upload_database_fragments(job["fragments"], job.get("force", False))
+        elif job["type"] == "json_database":
+            upload_handler.upload_json_database(job["data"], job.get("force", False))
+        elif job["type"] == "json_sponsors":
+            upload_handler.upload_json_sponsors(job["data"], job.get("force", False))
+        elif job["type"] == "message":
+            upload_handler.upload_message(job["title"], job["message"], datetime.datetime.fromtimestamp(job["time"]))
+        else:
+            raise Exception("Unknown upload job type {0}".format(job["type"]))
+
+        os.remove(sending_file_name)
+
+    def __set_aside(self, job_name):
+        """
+        Move a job that keeps failing out of the queue, to be looked at by hand
+        @param job_name: the file name of the job, without extension
+        @type job_name: str
+        @rtype: None
+        """
+        os.makedirs(self.__failed_folder, exist_ok=True)
+        for extension in (".sending", ".job"):
+            try:
+                os.replace(os.path.join(self.__outbox_folder, job_name + extension),
+                           os.path.join(self.__failed_folder, job_name + ".job"))
+            except FileNotFoundError:
+                continue
+            self.__log("{0} set aside".format(job_name))
+            break
+
+    def __acquire_lock(self):
+        """
+        @rtype: bool
+        """
+        os.makedirs(self.__outbox_folder, exist_ok=True)
+
+        # the contents tell this lock apart from every other one, also from an earlier lock of the same process;
+        # linking a complete file creates the lock with its contents at once, and fails when there is a lock
+        self.__lock_content = "{0} {1}".format(os.getpid(), time.time_ns())
+        new_lock_file_name = "{0}.{1}.new".format(self.__lock_file_name, self.__lock_content.replace(" ", "-"))
+        with open(new_lock_file_name, "w") as lock_file:
+            lock_file.write(self.__lock_content)
+
+        try:
+            for _ in range(2):
+                try:
+                    os.link(new_lock_file_name, self.__lock_file_name)
+                    return True
+                except FileExistsError:
+                    abandoned_lock_content = self.__get_abandoned_lock()
+                    if abandoned_lock_content is None:
+                        return False
+                    self.__take_over_lock(abandoned_lock_content)
+
+            return False
+        finally:
+            os.remove(new_lock_file_name)
+
+    def __get_abandoned_lock(self):
+        """
+        The contents of the lock file of a worker that died, or None when the worker is running
+        @rtype: str
+        """
+        if self.is_worker_running():
+            return None
+
+        try:
+            with open(self.__lock_file_name, "r") as lock_file:
+                return lock_file.read()
+        except FileNotFoundError:
+            # released in the meantime
+            return ""
+
+    def __take_over_lock(self, abandoned_lock_content):
+        """
+        Remove the lock of a worker that died. Renaming makes sure only one worker does so; when another worker
+        took over the same lock first, the lock that is renamed is its new one, which is put back
+        @type abandoned_lock_content: str
+        @rtype: None
+        """
+        taken_lock_file_name = "{0}.{1}.old".format(self.__lock_file_name, self.__lock_content.replace(" ", "-"))
+        try:
+            os.replace(self.__lock_file_name, taken_lock_file_name)
+        except FileNotFoundError:
+            return
+
+        with open(taken_lock_file_name, "r") as lock_file:
+            taken_lock_content = lock_file.read()
+        if taken_lock_content != abandoned_lock_content:
+            try:
+                # unlike renaming, linking never overwrites a lock that was taken in the meantime
+                os.link(taken_lock_file_name, self.__lock_file_name)
+            except FileExistsError:
+                pass
+        os.remove(taken_lock_file_name)
+
+    def __release_lock(self):
+        try:
+            with open(self.__lock_file_name, "r") as lock_file:
+                if lock_file.read() != self.__lock_content:
+                    return
+            os.remove(self.__lock_file_name)
+        except FileNotFoundError:
+            pass
+
+    def __beat(self, stopped):
+        """
+        Keep touching the lock file while the worker is alive, also during long uploads
+        @type stopped: threading.Event
+        @rtype: None
+        """
+        while not stopped.wait(self.__heartbeat_interval):
+            try:
+                os.utime(self.__lock_file_name)
+            except FileNotFoundError:
+                pass
+
+    def __log(self, message):
+        with open(self.__log_file_name, "a") as log_file:
+            log_file.write("{0} {1}\n".format(datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S"), message))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send the queued uploads of an outbox")
+    parser.add_argument("folder")
+    parser.add_argument("--url")
+    parser.add_argument("--delta-uploads", action="store_true")
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--results-window", type=float, default=2.0)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    options = parser.parse_args()
+
+    UploadOutbox(options.folder, options.url, options.delta_uploads, options.compress, options.results_window,
+                 start_worker=False).run(options.idle_timeout)
@@ -1,24 +1,24 @@
 import os
 
-import xlwings
-
 from lib.excel_interop.excel_reader import ExcelReader
 from lib.excel_interop.excel_writer import ExcelWriter
+from lib.excel_interop.file_workbook import FileWorkbook
 from lib.logic.builder import Builder
 from lib.logic.persistence_handler import PersistenceHandler
 from lib.model.factory import Factory
-from lib.pdf_export.pdf_exporter import PdfExporter
-from lib.server.upload_handler import UploadHandler
+from lib.server.upload_outbox import UploadOutbox
 
 
-def generate_schedule():
+def generate_schedule(path=None):
     """
     Reads categories, pools, teams, pitches, and the template game schedule
     and generates complete games schedules.
     The model is NOT persisted, only written to Excel
+    @param path: an .xlsx or .xlsm file to work on instead of the workbook in Excel that called the macro
+    @type path: str
     @return:
     """
-    workbook = xlwings.Book.caller()
+    workbook = __get_workbook(path)
 
     reader = ExcelReader(workbook)
     writer = ExcelWriter(workbook)
@@ -29,15 +29,19 @@ def generate_schedule():
     writer.write_game_schedule(model.game_schedule)
     writer.write_games_per_team(model.relevant_pools, model.game_schedule)
 
+    __save_workbook(workbook)
+
 
-def export_model():
+def export_model(path=None):
     """
     Reads all information in the Excel (including potential referees/jury)
     and serializes everything to a binary database.
     This method does NOT write anything to Excel.
+    @param path: an .xlsx or .xlsm file to work on instead of the workbook in Excel that called the macro
+    @type path: str
     @return:
     """
-    workbook = xlwings.Book.caller()
+    workbook = __get_workbook(path, read_only=True)
 
     reader = ExcelReader(workbook)
     builder = Builder(Factory())
@@ -49,15 +53,18 @@ def export_model():
 
 def upload_model():
     """
-    Upload the model that is serialized to disk to the server.
+    Queue the model that is serialized to disk for upload to the server.
+    Everything is uploaded, even when the server should have it already.
     This method does NOT communicate with Excel at all.
     @return:
     """
-    model = PersistenceHandler(os.path.dirname(__file__)).load_model()
+    persistence_handler = PersistenceHandler(os.path.dirname(__file__))
+
+    uploader = UploadOutbox(os.path.dirname(__file__))
+    uploader.upload_json_database(persistence_handler.load_json_database(), force=True)
+    uploader.upload_json_sponsors(persistence_handler.load_json_sponsors(), force=True)
 
-    uploader = UploadHandler()
-    uploader.upload_database(model)
-    uploader.upload_sponsors(model)
+    __report_upload_problems(uploader)
 
 
 # def print_database():
@@ -65,89 +72,162 @@ def upload_model():
 #    print model.get_json_database()
 
 
-def load_printable_schedule():
+def load_printable_schedule(path=None):
     """
     Load a database that is serialized to disk and loads it into Excel.
+    @param path: an .xlsx or .xlsm file to work on instead of the workbook in Excel that called the macro
+    @type path: str
     @return:
     """
 
-    workbook = xlwings.Book.caller()
+    workbook = __get_workbook(path)
+
+    persistence_handler = PersistenceHandler(os.path.dirname(__file__))
+    model = persistence_handler.load_model()
+
+    # the sheets are written in full; what was written is kept, so that later reprints only need to write changes
+    __write_printable_schedule(workbook, model, persistence_handler, {})
+
+
+def __write_printable_schedule(workbook, model, persistence_handler, written_sheets, autofit=True):
+    ExcelWriter(workbook, written_sheets).write_printable_game_schedule(model.game_schedule, model.pool_by_game,
+                                                                        autofit)
+    persistence_handler.store_written_sheets(workbook.fullname, written_sheets)
+    __save_workbook(workbook)
+
+
+def __get_workbook(path=None, read_only=False):
+    """
+    The workbook file at the given path, or the workbook in Excel that called the macro
+    @type path: str
+    @param read_only: stream the file, when it is only read
+    @type read_only: bool
+    """
+    if path:
+        return FileWorkbook(path, read_only)
+
+    # xlwings needs Excel; it is only imported when the macros are called from it
+    import xlwings
+    return xlwings.Book.caller()
 
-    model = PersistenceHandler(os.path.dirname(__file__)).load_model()
 
-    __write_printable_schedule(workbook, model)
+def __save_workbook(workbook):
+    # Excel shows the changes to its workbook right away; a file has to be saved
+    if isinstance(workbook, FileWorkbook):
+        workbook.save()
 
 
-def __write_printable_schedule(workbook, model):
-    pool_by_game = {game: pool
-                    for pool in model.all_pools
-                    for game in pool.own_games}
-    ExcelWriter(workbook).write_printable_game_schedule(model.game_schedule, pool_by_game)
+def __report_upload_problems(uploader):
+    """
+    Tell the operator about uploads that do not get through, once the macro has done everything else
+    @type uploader: UploadOutbox
+    """
+    problems = uploader.get_problems()
+    if problems:
+        # Excel shows the message of an error raised by a macro
+        raise Exception(problems)
 
 
-def handle_results():
-    workbook = xlwings.Book.caller()
+def handle_results(path=None):
+    """
+    Reads the results from the printable schedule and processes them; the printable schedule is updated when
+    teams of later games are known because of them
+    @param path: an .xlsx or .xlsm file to work on instead of the workbook in Excel that called the macro
+    @type path: str
+    @return:
+    """
+    workbook = __get_workbook(path)
 
     persistence_handler = PersistenceHandler(os.path.dirname(__file__))
-    upload_handler = UploadHandler()
+    upload_handler = UploadOutbox(os.path.dirname(__file__))
     reader = ExcelReader(workbook)
 
     model = persistence_handler.load_model()
+    fingerprints = persistence_handler.load_fingerprints(workbook.fullname)
 
-    all_game_results = reader.load_results()
+    # only the rows that changed since the last run; without fingerprints, the rows that differ from the model
+    known_results = {game.name: game.result for game in model.games if game.result}
+    changed_game_results, fingerprints["results"] = reader.load_changed_results(fingerprints.get("results", {}),
+                                                                                known_results)
 
-    new_results, schedule_has_changed = model.apply_new_game_results(all_game_results)
+    changes = model.apply_new_game_results(changed_game_results, partial=True)
 
-    upload_handler.upload_results(new_results)
+    upload_handler.upload_results(changes.new_results)
 
-    if schedule_has_changed:
+    if changes.schedule_has_changed:
         # if the schedule has changed, we need to update Excel and app
-        __write_printable_schedule(workbook, model)
+        # the columns were fitted when the schedule was first printed; only the cells whose contents changed are
+        # written, so referees and juries entered since then are left alone
+        __write_printable_schedule(workbook, model, persistence_handler,
+                                   persistence_handler.load_written_sheets(workbook.fullname), autofit=False)
         upload_handler.upload_database(model)
 
-    persistence_handler.store_model(model)
+    persistence_handler.store_results(model, changes.new_results)
+    # the results are safe now; until here, a failed run hands back the same rows the next time
+    persistence_handler.store_fingerprints(workbook.fullname, fingerprints)
 
+    __report_upload_problems(upload_handler)
 
-def handle_referees_and_jury():
-    workbook = xlwings.Book.caller()
+
+def handle_referees_and_jury(path=None):
+    """
+    Reads the referees and juries from the printable schedule and processes them
+    @param path: an .xlsx or .xlsm file to work on instead of the workbook in Excel that called the macro
+    @type path: str
+    @return:
+    """
+    workbook = __get_workbook(path, read_only=True)
 
     persistence_handler = PersistenceHandler(os.path.dirname(__file__))
-    upload_handler = UploadHandler()
+    upload_handler = UploadOutbox(os.path.dirname(__file__))
     reader = ExcelReader(workbook)
 
     model = persistence_handler.load_model()
+    fingerprints = persistence_handler.load_fingerprints(workbook.fullname)
 
-    all_referees_and_juries = reader.load_referees_and_juries()
+    # only the rows that changed since the last run; without fingerprints, the rows that differ from the model
+    known_referees_and_juries = {game.name: (game.get_referees_string(), game.jury) for game in model.games
+                                 if game.get_referees_string() or game.jury}
+    changed_referees_and_juries, fingerprints["referees_and_juries"] = \
+        reader.load_changed_referees_and_juries(fingerprints.get("referees_and_juries", {}),
+                                                known_referees_and_juries)
 
-    referees_have_changed, juries_have_changed = model.apply_referees_and_juries(all_referees_and_juries)
+    games_with_new_referees, games_with_new_jury = model.apply_referees_and_juries(changed_referees_and_juries)
 
     # we only need to update the app if the referees have changed, because jury is not in there
-    if referees_have_changed:
+    if games_with_new_referees:
         upload_handler.upload_database(model)
 
-    if referees_have_changed or juries_have_changed:
-        persistence_handler.store_model(model)
+    persistence_handler.store_referees_and_juries(model, games_with_new_referees + games_with_new_jury)
+    persistence_handler.store_fingerprints(workbook.fullname, fingerprints)
+
+    __report_upload_problems(upload_handler)
 
 
 def generate_rankings_pdf():
-    model = PersistenceHandler(os.path.dirname(__file__)).load_model()
+    pools = PersistenceHandler(os.path.dirname(__file__)).load_pools()
 
     # there is no way to generalize this; that's why this setting is top-level. It is not needed
     page_layout = [["H1"], ["H2"], ["H3"], ["H4"], ["D1"], ["D2"], ["JB", "MBC", "JC"], ["GD"], ["GE"]]
 
-    PdfExporter().export_rankings(model.pools, page_layout)
+    # pdfkit is only needed for the pdfs; the other macros run without it
+    from lib.pdf_export.pdf_exporter import PdfExporter
+    PdfExporter().export_rankings(pools, page_layout)
 
 
 def generate_schedule_pdf(export_saturday, export_sunday):
-    model = PersistenceHandler(os.path.dirname(__file__)).load_model()
+    game_schedule = PersistenceHandler(os.path.dirname(__file__)).load_game_schedule()
 
-    PdfExporter().export_schedule(model.game_schedule, export_saturday, export_sunday)
+    from lib.pdf_export.pdf_exporter import PdfExporter
+    PdfExporter().export_schedule(game_schedule, export_saturday, export_sunday)
 
 if __name__ == '__main__':
+    import xlwings
+
     path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'Voor toernooi.xlsm'))
     xlwings.Book(path).set_mock_caller()
 
     # handle_referees_and_jury()
-    # UploadHandler().upload_message("Test", "Dit is een test")
+    # UploadOutbox(os.path.dirname(__file__)).upload_message("Test", "Dit is een test")
     export_model()
 
@@ -0,0 +1,10 @@
+import sys
+import types
+
+# the password of the app server is not part of the repository; the tests only talk to the local stand-in
+try:
+    import lib.server.password
+except ImportError:
+    password_module = types.ModuleType("lib.server.password")
+    password_module.password = "test"
+    sys.modules["lib.server.password"] = password_module
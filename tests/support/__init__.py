@@ -0,0 +1,4 @@
+"""
+The synthetic tournament, the in-memory stand-in of the workbook and workbook files, shared by the tests and the
+benchmarks
+"""
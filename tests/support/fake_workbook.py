@@ -0,0 +1,183 @@
+"""
+An in-memory stand-in for the parts of xlwings that the excel_interop package uses.
+It counts the calls that would cross the process boundary to Excel and the cells moved by them.
+"""
+import re
+
+SHEET_NAMES = ["Poules", "Scheidsrechters", "Teams", "Wedstrijden", "Sponsors", "Schema", "Schema Veld 4",
+               "Wedstrijden per team", "Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+class FakeBook:
+    def __init__(self, sheet_names=SHEET_NAMES, fullname="fake.xlsm"):
+        self.fullname = fullname
+        self.calls = 0
+        self.cells_read = 0
+        self.cells_written = 0
+        self.__sheets = {name: FakeSheet(self, name) for name in sheet_names}
+
+    def sheets(self, name):
+        return self.__sheets[name]
+
+    def reset_counters(self):
+        self.calls = 0
+        self.cells_read = 0
+        self.cells_written = 0
+
+
+class FakeSheet:
+    def __init__(self, book, name):
+        self.book = book
+        self.name = name
+        self.cells = {}
+        self.colors = {}
+
+    def range(self, address, last_cell=None):
+        """
+        @param address: "A1", "A1:CZ100" or a (row, column) tuple, 1-based like xlwings
+        @param last_cell: the (row, column) tuple of the bottom right cell, when address is a tuple
+        """
+        if isinstance(address, tuple):
+            last_cell = last_cell or address
+            return FakeRange(self, address[0], address[1], last_cell[0], last_cell[1])
+
+        corners = [self.__parse(corner) for corner in address.split(":")]
+        (first_row, first_column), (last_row, last_column) = corners[0], corners[-1]
+        return FakeRange(self, first_row, first_column, last_row, last_column)
+
+    @property
+    def used_range(self):
+        self.book.calls += 1
+        last_row = max([row for row, _ in self.cells] or [1])
+        last_column = max([column for _, column in self.cells] or [1])
+        return FakeRange(self, 1, 1, last_row, last_column)
+
+    def clear(self):
+        self.book.calls += 1
+        self.cells = {}
+        self.colors = {}
+
+    def autofit(self, axis=None):
+        self.book.calls += 1
+
+    def get_matrix(self):
+        """
+        The contents of the sheet as a list of rows, without counting; for checks by tests and benchmarks
+        @rtype: list[list]
+        """
+        used_range = FakeRange(self, 1, 1, max([row for row, _ in self.cells] or [1]),
+                               max([column for _, column in self.cells] or [1]))
+        return [[self.cells.get((row, column)) for column in range(used_range.column, used_range.last_column + 1)]
+                for row in range(used_range.row, used_range.last_row + 1)]
+
+    @staticmethod
+    def __parse(corner):
+        letters, digits = re.match(r"([A-Z]+)(\d+)", corner).groups()
+        column = 0
+        for letter in letters:
+            column = column * 26 + ord(letter) - ord("A") + 1
+        return int(digits), column
+
+
+class FakeRange:
+    def __init__(self, sheet, row, column, last_row, last_column, ndim=None):
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+        self.last_row = last_row
+        self.last_column = last_column
+        self.__ndim = ndim
+
+    @property
+    def last_cell(self):
+        self.sheet.book.calls += 1
+        return FakeRange(self.sheet, self.last_row, self.last_column, self.last_row, self.last_column)
+
+    @property
+    def shape(self):
+        return self.last_row - self.row + 1, self.last_column - self.column + 1
+
+    @property
+    def address(self):
+        return "${0}${1}:${2}${3}".format(self.__column_name(self.column), self.row,
+                                         self.__column_name(self.last_column), self.last_row)
+
+    def options(self, ndim=None, **kwargs):
+        return FakeRange(self.sheet, self.row, self.column, self.last_row, self.last_column, ndim)
+
+    @property
+    def value(self):
+        """
+        Like xlwings: a scalar for one cell, a list for one row or column, and a list of rows otherwise,
+        unless ndim=2 is given; empty cells are None
+        """
+        self.sheet.book.calls += 1
+        rows, columns = self.shape
+        self.sheet.book.cells_read += rows * columns
+
+        cells = self.sheet.cells
+        matrix = [[cells.get((row, column)) for column in range(self.column, self.last_column + 1)]
+                  for row in range(self.row, self.last_row + 1)]
+
+        if self.__ndim == 2:
+            return matrix
+        if rows == 1 and columns == 1:
+            return matrix[0][0]
+        if rows == 1:
+            return matrix[0]
+        if columns == 1:
+            return [row[0] for row in matrix]
+        return matrix
+
+    @value.setter
+    def value(self, value):
+        """
+        Like xlwings, a list of rows is written from the top left cell of the range; empty strings clear cells
+        """
+        self.sheet.book.calls += 1
+
+        matrix = value if isinstance(value, list) else [[value]]
+        if matrix and not isinstance(matrix[0], (list, tuple)):
+            matrix = [matrix]
+
+        cells = self.sheet.cells
+        for r, row in enumerate(matrix):
+            for c, cell in enumerate(row):
+                if cell is None or cell == "":
+                    cells.pop((self.row + r, self.column + c), None)
+                else:
+                    cells[(self.row + r, self.column + c)] = cell
+            self.sheet.book.cells_written += len(row)
+
+    @property
+    def color(self):
+        self.sheet.book.calls += 1
+        return self.sheet.colors.get((self.row, self.column))
+
+    @color.setter
+    def color(self, color):
+        self.sheet.book.calls += 1
+        for row in range(self.row, self.last_row + 1):
+            for column in range(self.column, self.last_column + 1):
+                self.sheet.colors[(row, column)] = color
+
+    @staticmethod
+    def __column_name(column):
+        name = ""
+        while column:
+            column, remainder = divmod(column - 1, 26)
+            name = chr(remainder + ord("A")) + name
+        return name
+
+
+def find_column(sheet, header):
+    """
+    Get the 1-based column of the given header in the first row, without counting
+    @type sheet: FakeSheet
+    @type header: str
+    @rtype: int
+    """
+    for (row, column), value in sheet.cells.items():
+        if row == 1 and value == header:
+            return column
+    raise KeyError(header)
@@ -0,0 +1,84 @@
+import datetime
+import math
+import random
+
+from lib.common.flat_data import FlatData
+from lib.logic.builder import Builder
+from lib.model.factory import Factory
+from lib.model.game_result import GameResult
+
+# (abbreviation suffix, pool type, number of teams, number of games) of the pools in every category
+POOL_LAYOUT = [
+    ("P1", "FWSF", 4, 10),
+    ("P2", "SWSF", 8, 20),
+    ("P3", "SRR", 6, 15),
+    ("P4", "SWF", 6, 9),
+]
+
+
+def create_flat_data(scale=1, number_of_pitches=4):
+    """
+    Create the flat data of a synthetic tournament with scale categories of 4 pools (54 games) each.
+    Games are spread over the pitches and over exactly two days, as the GameSchedule requires
+    @type scale: int
+    @type number_of_pitches: int
+    @rtype: FlatData
+    """
+    categories = []
+    pools_by_category = {}
+    pool_info_by_pool = {}
+    game_slots = []
+
+    for c in range(scale):
+        category = "Categorie {0}".format(c + 1)
+        categories.append(category)
+        pools_by_category[category] = []
+
+        for suffix, pool_type, number_of_teams, number_of_games in POOL_LAYOUT:
+            abbreviation = "C{0}{1}".format(c + 1, suffix)
+            pools_by_category[category].append(("Poule " + abbreviation, abbreviation))
+            pool_info_by_pool[abbreviation] = (pool_type, ["Team {0}-{1}".format(abbreviation, t + 1)
+                                                           for t in range(number_of_teams)])
+            game_slots.extend([abbreviation] * number_of_games)
+
+    pitches = ["Veld {0}".format(p + 1) for p in range(number_of_pitches)]
+
+    rows = int(math.ceil(len(game_slots) / float(number_of_pitches)))
+    rows_per_day = int(math.ceil(rows / 2.0))
+    seconds_per_row = min(900, 12 * 3600 // rows_per_day)
+
+    games_by_pitch = {pitch: [] for pitch in pitches}
+    for slot, abbreviation in enumerate(game_slots):
+        row = slot // number_of_pitches
+        day, row_of_day = divmod(row, rows_per_day)
+        start = datetime.datetime(2026, 6, 13 + day, 8)
+        games_by_pitch[pitches[slot % number_of_pitches]].append(
+            (start + datetime.timedelta(seconds=seconds_per_row * row_of_day), abbreviation))
+
+    referees = ["Scheids{0} Achternaam".format(r + 1) for r in range(10 * scale)]
+    sponsors = [("Sponsor {0}".format(s + 1), "https://sponsor{0}.nl".format(s + 1)) for s in range(10)]
+
+    return FlatData(categories, pools_by_category, pool_info_by_pool, referees, pitches, games_by_pitch, sponsors, {})
+
+
+def create_model(scale=1):
+    """
+    @type scale: int
+    @rtype: Model
+    """
+    return Builder(Factory()).load(create_flat_data(scale))
+
+
+def create_results(model, fraction=1.0, seed=1):
+    """
+    Create random results for the first fraction of the games, in chronological order, keyed by game name
+    @type model: Model
+    @type fraction: float
+    @type seed: int
+    @rtype: dict[str, GameResult]
+    """
+    generator = random.Random(seed)
+    games = sorted(model.games, key=lambda g: (g.datetime, g.pitch.rank))
+
+    return {game.name: GameResult(generator.randint(0, 5), generator.randint(0, 5))
+            for game in games[:int(len(games) * fraction)]}
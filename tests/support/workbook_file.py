@@ -0,0 +1,45 @@
+"""
+Workbook files with the sheets of the tournament, for the tests that work on a file instead of Excel
+"""
+import openpyxl
+
+POOL_TYPES = {"SRR": "Halve competitie", "FRR": "Hele competitie", "SWSF": "Splits met halve finales",
+              "SWF": "Splits met finales", "FWSF": "Poule met halve finales", "FWF": "Poule met finales",
+              "PRR": "Gedeeltelijke competitie"}
+
+OUTPUT_SHEETS = ["Schema", "Schema Veld 4", "Wedstrijden per team", "Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+def add_sheet(workbook, name, columns):
+    sheet = workbook.create_sheet(name)
+    for c, (header, values) in enumerate(columns):
+        sheet.cell(1, c + 1).value = header
+        for r, value in enumerate(values):
+            sheet.cell(r + 2, c + 1).value = value
+
+
+def create_workbook(path, flat_data):
+    """
+    Save a workbook with the sheets that are filled in by hand, and the empty sheets that the macros write to
+    """
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+
+    pools = {category: flat_data.get_pools_by_category(category) for category in flat_data.categories}
+    add_sheet(workbook, "Poules", [(category, ["{0} ({1})".format(pool, abbreviation)
+                                               for pool, abbreviation, _ in pools[category]])
+                                   for category in flat_data.categories])
+    add_sheet(workbook, "Teams", [(abbreviation,
+                                   [POOL_TYPES[pool_type]] + flat_data.get_teams_by_pool_abbr(abbreviation))
+                                  for category in flat_data.categories
+                                  for _, abbreviation, pool_type in pools[category]])
+    add_sheet(workbook, "Scheidsrechters", [("Naam", flat_data.referees)])
+    add_sheet(workbook, "Sponsors", [("Naam", [name for name, _ in flat_data.sponsors]),
+                                     ("Website", [uri for _, uri in flat_data.sponsors])])
+    games_by_pitch = [flat_data.get_games_by_pitch(pitch) for pitch in flat_data.pitches]
+    add_sheet(workbook, "Wedstrijden", [("Tijd", [time for time, _ in games_by_pitch[0]])] +
+              [(pitch, [pool for _, pool in games]) for pitch, games in zip(flat_data.pitches, games_by_pitch)])
+    for name in OUTPUT_SHEETS:
+        workbook.create_sheet(name)
+
+    workbook.save(path)
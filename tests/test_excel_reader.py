@@ -0,0 +1,94 @@
+import pytest
+
+from lib.excel_interop.excel_reader import ExcelReader
+from lib.excel_interop.excel_writer import ExcelWriter
+from tests.support.fake_workbook import FakeBook, find_column
+from tests.support.synthetic import create_model, create_results
+
+
+def print_schedule(model):
+    workbook = FakeBook()
+    ExcelWriter(workbook).write_printable_game_schedule(model.game_schedule, model.pool_by_game)
+    return workbook
+
+
+def find_row(workbook, game_name):
+    for sheet_name in ["Zaterdag", "Zaterdag Veld 4", "Zondag"]:
+        sheet = workbook.sheets(sheet_name)
+        id_column = find_column(sheet, "Id")
+        for (row, column), value in sheet.cells.items():
+            if column == id_column and value == game_name:
+                return sheet, row
+
+
+def enter_result(workbook, game_name, home_score, away_score):
+    sheet, row = find_row(workbook, game_name)
+    for header, score in (("DW", home_score), ("DB", away_score)):
+        if score is None:
+            sheet.cells.pop((row, find_column(sheet, header)), None)
+        else:
+            sheet.cells[(row, find_column(sheet, header))] = score
+
+
+def get_known_results(model):
+    return {game.name: game.result for game in model.games if game.result}
+
+
+def get_known_referees_and_juries(model):
+    return {game.name: (game.get_referees_string(), game.jury) for game in model.games
+            if game.get_referees_string() or game.jury}
+
+
+def test_only_changed_rows_are_read_again():
+    model = create_model()
+    model.apply_new_game_results(create_results(model, 0.5))
+    workbook = print_schedule(model)
+    _, fingerprints = ExcelReader(workbook).load_changed_results({}, get_known_results(model))
+
+    game = next(game for game in model.games if not game.result)
+    enter_result(workbook, game.name, 2, 1)
+    changed, _ = ExcelReader(workbook).load_changed_results(fingerprints, get_known_results(model))
+
+    assert list(changed) == [game.name]
+    assert (changed[game.name].home_score, changed[game.name].away_score) == (2, 1)
+
+
+def test_rows_like_the_model_are_not_read_without_fingerprints():
+    model = create_model()
+    model.apply_new_game_results(create_results(model, 0.5))
+    workbook = print_schedule(model)
+
+    changed, fingerprints = ExcelReader(workbook).load_changed_results({}, get_known_results(model))
+
+    assert changed == {}
+    assert len(fingerprints) == len(model.games)
+
+
+def test_erased_result_is_noticed_without_fingerprints():
+    model = create_model()
+    model.apply_new_game_results(create_results(model, 0.5))
+    workbook = print_schedule(model)
+
+    game = next(game for game in model.games if game.result)
+    enter_result(workbook, game.name, None, None)
+    changed, _ = ExcelReader(workbook).load_changed_results({}, get_known_results(model))
+
+    assert changed == {game.name: None}
+    with pytest.raises(Exception, match="Cannot erase a result"):
+        model.apply_new_game_results(changed, partial=True)
+
+
+def test_cleared_referees_and_jury_are_noticed_without_fingerprints():
+    model = create_model()
+    game = model.games[0]
+    model.apply_referees_and_juries({game.name: {"referees": model.referees[0].get_first_name(), "jury": "H1"}})
+    workbook = print_schedule(model)
+
+    sheet, row = find_row(workbook, game.name)
+    for header in ("Scheidsrechters", "Jury"):
+        sheet.cells.pop((row, find_column(sheet, header)))
+    changed, _ = ExcelReader(workbook).load_changed_referees_and_juries({}, get_known_referees_and_juries(model))
+
+    assert changed == {game.name: {"referees": "", "jury": ""}}
+    assert model.apply_referees_and_juries(changed) == ([game], [game])
+    assert (game.referee1, game.jury) == (None, "")
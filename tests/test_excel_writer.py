@@ -0,0 +1,87 @@
+from lib.excel_interop.excel_writer import ExcelWriter
+from tests.support.fake_workbook import FakeBook, find_column
+from tests.support.synthetic import create_model, create_results
+
+PRINTABLE_SHEETS = ["Zaterdag", "Zaterdag Veld 4", "Zondag"]
+
+
+def print_schedule(workbook, model, written_sheets=None, autofit=True):
+    ExcelWriter(workbook, written_sheets).write_printable_game_schedule(model.game_schedule, model.pool_by_game,
+                                                                        autofit)
+
+
+def play(model, fraction):
+    results = create_results(model, 1.0)
+    names = [game.name for game in sorted(model.games, key=lambda g: (g.datetime, g.pitch.rank))]
+    model.apply_new_game_results({name: results[name] for name in names[:int(len(names) * fraction)]})
+
+
+def assert_same_sheets(workbook, expected):
+    for name in PRINTABLE_SHEETS:
+        assert workbook.sheets(name).get_matrix() == expected.sheets(name).get_matrix()
+        assert {cell: color for cell, color in workbook.sheets(name).colors.items() if color} == \
+            {cell: color for cell, color in expected.sheets(name).colors.items() if color}
+
+
+def print_in_full(model):
+    workbook = FakeBook()
+    print_schedule(workbook, model)
+    return workbook
+
+
+def test_reprint_only_writes_changes():
+    model = create_model()
+    play(model, 0.3)
+    workbook, written_sheets = FakeBook(), {}
+    print_schedule(workbook, model, written_sheets)
+
+    play(model, 0.4)
+    workbook.reset_counters()
+    print_schedule(workbook, model, written_sheets, False)
+
+    assert workbook.cells_written < 100
+    assert_same_sheets(workbook, print_in_full(model))
+
+
+def test_reprint_keeps_entries_in_unchanged_cells():
+    model = create_model()
+    workbook, written_sheets = FakeBook(), {}
+    print_schedule(workbook, model, written_sheets)
+
+    sheet = workbook.sheets("Zondag")
+    jury_column = find_column(sheet, "Jury")
+    sheet.cells[(2, jury_column)] = "Team 1"
+
+    play(model, 0.5)
+    print_schedule(workbook, model, written_sheets, False)
+
+    assert sheet.cells[(2, jury_column)] == "Team 1"
+
+
+def test_reprint_after_deleted_row_writes_in_full():
+    model = create_model()
+    workbook, written_sheets = FakeBook(), {}
+    print_schedule(workbook, model, written_sheets)
+
+    # the operator deleted the second game of the sheet, which moved the rows below it up
+    sheet = workbook.sheets("Zaterdag")
+    sheet.cells = {(row - 1 if row > 3 else row, column): value for (row, column), value in sheet.cells.items()
+                   if row != 3}
+
+    play(model, 0.5)
+    workbook.reset_counters()
+    print_schedule(workbook, model, written_sheets, False)
+
+    assert_same_sheets(workbook, print_in_full(model))
+
+
+def test_reprint_to_another_workbook_writes_in_full():
+    model = create_model()
+    written_sheets = {}
+    print_schedule(FakeBook(), model, written_sheets)
+
+    play(model, 0.5)
+    workbook = FakeBook()
+    print_schedule(workbook, model, written_sheets, False)
+
+    assert_same_sheets(workbook, print_in_full(model))
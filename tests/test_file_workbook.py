@@ -0,0 +1,109 @@
+import datetime
+import os
+import zipfile
+
+import openpyxl
+import pytest
+
+from lib.excel_interop.excel_reader import ExcelReader
+from lib.excel_interop.excel_writer import ExcelWriter
+from lib.excel_interop.file_workbook import FileWorkbook
+from tests.support.synthetic import create_flat_data, create_model, create_results
+from tests.support.workbook_file import create_workbook
+
+
+def calculate(path, sheet_name, cell, value):
+    """
+    Store the value of a formula in the file as Excel does when it saves a workbook; openpyxl leaves it out
+    """
+    sheet_file_name = "xl/worksheets/sheet{0}.xml".format(openpyxl.load_workbook(path).sheetnames.index(sheet_name) + 1)
+    with zipfile.ZipFile(path) as archive:
+        contents = {name: archive.read(name) for name in archive.namelist()}
+
+    start = contents[sheet_file_name].index('<c r="{0}"'.format(cell).encode("utf-8"))
+    end = contents[sheet_file_name].index(b"</c>", start)
+    contents[sheet_file_name] = contents[sheet_file_name][:start] + \
+        contents[sheet_file_name][start:end].replace(b"<v />", "<v>{0}</v>".format(value).encode("utf-8")) + \
+        contents[sheet_file_name][end:]
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in contents.items():
+            archive.writestr(name, data)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = os.path.join(str(tmp_path), "toernooi.xlsx")
+    create_workbook(path, create_flat_data())
+    return path
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_read_round_trip(path, read_only):
+    flat_data = create_flat_data()
+
+    read = ExcelReader(FileWorkbook(path, read_only)).read()
+
+    assert read.categories == flat_data.categories
+    for category in flat_data.categories:
+        assert read.get_pools_by_category(category) == flat_data.get_pools_by_category(category)
+        for _, abbreviation, _ in flat_data.get_pools_by_category(category):
+            assert read.get_teams_by_pool_abbr(abbreviation) == flat_data.get_teams_by_pool_abbr(abbreviation)
+    assert read.referees == flat_data.referees
+    assert read.pitches == flat_data.pitches
+    for pitch in flat_data.pitches:
+        assert list(read.get_games_by_pitch(pitch)) == flat_data.get_games_by_pitch(pitch)
+    assert list(read.sponsors) == flat_data.sponsors
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_printable_schedule_round_trip(path, read_only):
+    model = create_model()
+    model.apply_new_game_results(create_results(model, 0.5))
+    workbook = FileWorkbook(path)
+    ExcelWriter(workbook).write_printable_game_schedule(model.game_schedule, model.pool_by_game)
+    workbook.save()
+
+    reader = ExcelReader(FileWorkbook(path, read_only))
+
+    assert reader.load_results() == {game.name: game.result for game in model.games if game.result}
+    assert set(reader.load_referees_and_juries()) == {game.name for game in model.games}
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_formula_cells_are_read_as_their_values(path, read_only):
+    model = create_model()
+    workbook = FileWorkbook(path)
+    ExcelWriter(workbook).write_printable_game_schedule(model.game_schedule, model.pool_by_game)
+    sheet = workbook.sheets("Zaterdag")
+    game_name = sheet.range("L2").value
+    sheet.range("I2").value = [["=1+2", "-", 1]]
+    workbook.save()
+    calculate(path, "Zaterdag", "I2", 3)
+
+    results = ExcelReader(FileWorkbook(path, read_only)).load_results()
+
+    assert results[game_name].home_score == 3
+    assert results[game_name].away_score == 1
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_time_values_are_read_like_xlwings(path, read_only):
+    workbook = FileWorkbook(path)
+    workbook.sheets("Schema").range("A1").value = [["Tijd"], [datetime.time(9, 30)]]
+    workbook.save()
+
+    sheet = FileWorkbook(path, read_only).sheets("Schema")
+
+    # Excel has no time type; xlwings reads times as datetimes on the first day of its calendar
+    assert sheet.range("A2").value == datetime.datetime(1899, 12, 30, 9, 30)
+    assert sheet.used_range.last_cell.row == 2
+
+
+def test_read_only_workbook_cannot_be_written(path):
+    workbook = FileWorkbook(path, read_only=True)
+
+    with pytest.raises(Exception):
+        workbook.sheets("Zondag").range("A1").value = "Tijd"
+    with pytest.raises(Exception):
+        workbook.save()
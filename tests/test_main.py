@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+import main
+from lib.excel_interop.file_workbook import FileWorkbook
+from lib.logic.persistence_handler import PersistenceHandler
+from lib.server.upload_outbox import UploadOutbox
+from tests.support.synthetic import create_flat_data
+from tests.support.workbook_file import create_workbook
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    # the macros keep the model and the outbox next to main.py; no worker is started to send the uploads
+    monkeypatch.setattr(main, "__file__", os.path.join(str(tmp_path), "main.py"))
+    monkeypatch.setattr(UploadOutbox, "start_worker", lambda self: None)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def path(folder):
+    path = os.path.join(folder, "toernooi.xlsx")
+    create_workbook(path, create_flat_data())
+    main.generate_schedule(path)
+    main.export_model(path)
+    main.load_printable_schedule(path)
+    return path
+
+
+def enter_result(path, home_score, away_score):
+    workbook = FileWorkbook(path)
+    sheet = workbook.sheets("Zaterdag")
+    game_name = sheet.range("L2").value
+    sheet.range("I2").value = [[home_score, "-", away_score]]
+    workbook.save()
+    return game_name
+
+
+def test_handle_results(folder, path):
+    game_name = enter_result(path, 3, 1)
+
+    main.handle_results(path)
+
+    game = next(game for game in PersistenceHandler(folder).load_model().games if game.name == game_name)
+    assert (game.result.home_score, game.result.away_score) == (3, 1)
+    assert UploadOutbox(folder).get_pending_jobs()[0].endswith("-results.job")
+
+
+def test_handled_results_are_not_uploaded_again(folder, path):
+    enter_result(path, 3, 1)
+    main.handle_results(path)
+
+    main.handle_results(path)
+
+    assert len(UploadOutbox(folder).get_pending_jobs()) == 1
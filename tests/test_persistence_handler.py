@@ -0,0 +1,112 @@
+import os
+
+from lib.logic.persistence_handler import PersistenceHandler
+from tests.support.synthetic import create_model, create_results
+
+
+def get_journal_lines(folder):
+    with open(os.path.join(folder, "model.journal"), "rb") as journal_file:
+        return journal_file.read().splitlines()
+
+
+def test_results_survive_a_reload(tmp_path):
+    folder = str(tmp_path)
+    model = create_model()
+    PersistenceHandler(folder).store_model(model)
+
+    changes = model.apply_new_game_results(create_results(model, 0.5))
+    PersistenceHandler(folder).store_results(model, changes.new_results)
+
+    loaded = PersistenceHandler(folder).load_model()
+    assert {game.id: game.result for game in loaded.games} == {game.id: game.result for game in model.games}
+
+
+def test_append_after_torn_record(tmp_path):
+    folder = str(tmp_path)
+    model = create_model()
+    PersistenceHandler(folder).store_model(model)
+
+    results = create_results(model, 0.2)
+    names = sorted(results)
+    changes = model.apply_new_game_results({name: results[name] for name in names[:3]})
+    PersistenceHandler(folder).store_results(model, changes.new_results)
+
+    # a crash while appending leaves half a record without a newline behind
+    with open(os.path.join(folder, "model.journal"), "ab") as journal_file:
+        journal_file.write(b'{"type": "result", "game": ')
+    assert len(PersistenceHandler(folder).load_model().games) == len(model.games)
+
+    changes = model.apply_new_game_results({name: results[name] for name in names})
+    PersistenceHandler(folder).store_results(model, changes.new_results)
+
+    assert len(get_journal_lines(folder)) == len(names)
+    loaded = PersistenceHandler(folder).load_model()
+    assert {game.id: game.result for game in loaded.games} == {game.id: game.result for game in model.games}
+
+
+def test_snapshot_after_interval(tmp_path):
+    folder = str(tmp_path)
+    model = create_model()
+    persistence_handler = PersistenceHandler(folder, snapshot_interval=5)
+    persistence_handler.store_model(model)
+
+    results = create_results(model, 1.0)
+    names = sorted(results)
+    for count in range(1, 5):
+        changes = model.apply_new_game_results({name: results[name] for name in names[:count]})
+        persistence_handler.store_results(model, changes.new_results)
+    assert len(get_journal_lines(folder)) == 4
+
+    changes = model.apply_new_game_results({name: results[name] for name in names[:5]})
+    persistence_handler.store_results(model, changes.new_results)
+    assert not os.path.exists(os.path.join(folder, "model.journal"))
+
+    loaded = PersistenceHandler(folder).load_model()
+    assert sum(1 for game in loaded.games if game.result) == 5
+
+
+def test_sections_follow_the_journal(tmp_path):
+    folder = str(tmp_path)
+    model = create_model()
+    PersistenceHandler(folder).store_model(model)
+    assert PersistenceHandler(folder).load_json_database() == model.get_json_database()
+
+    changes = model.apply_new_game_results(create_results(model, 0.5))
+    PersistenceHandler(folder).store_results(model, changes.new_results)
+
+    persistence_handler = PersistenceHandler(folder)
+    assert persistence_handler.load_json_database() == model.get_json_database()
+    assert persistence_handler.load_json_sponsors() == model.get_json_sponsors()
+    assert len(persistence_handler.load_game_schedule().games) == len(model.games)
+
+
+def test_snapshot_leaves_out_the_json_fragments(tmp_path):
+    folder = str(tmp_path)
+    model = create_model()
+    model.apply_new_game_results(create_results(model, 0.5))
+    PersistenceHandler(folder).store_model(model)
+    size = os.path.getsize(os.path.join(folder, "model.bin"))
+
+    json_database = model.get_json_database()
+    PersistenceHandler(folder).store_model(model)
+
+    assert os.path.getsize(os.path.join(folder, "model.bin")) == size
+    loaded = PersistenceHandler(folder).load_model()
+    assert loaded.get_json_database() == json_database
+    changes = loaded.apply_new_game_results(create_results(loaded, 1.0))
+    model.apply_new_game_results(create_results(model, 1.0))
+    assert changes.new_results and loaded.get_json_database() == model.get_json_database()
+
+
+def test_sheets_and_fingerprints_belong_to_their_workbook(tmp_path):
+    folder = str(tmp_path)
+    written_sheets = {"Zondag": (0, 0, [["Tijd", "Id"], ["10:00", "H1-01"]], [None, None])}
+    fingerprints = {"results": {"H1-01": (2.0, 1.0)}}
+    PersistenceHandler(folder).store_written_sheets("C:\\toernooi.xlsm", written_sheets)
+    PersistenceHandler(folder).store_fingerprints("C:\\toernooi.xlsm", fingerprints)
+
+    persistence_handler = PersistenceHandler(folder)
+    assert persistence_handler.load_written_sheets("C:\\toernooi.xlsm") == written_sheets
+    assert persistence_handler.load_fingerprints("C:\\toernooi.xlsm") == fingerprints
+    assert persistence_handler.load_written_sheets("C:\\toernooi - kopie.xlsm") == {}
+    assert persistence_handler.load_fingerprints("C:\\toernooi - kopie.xlsm") == {}
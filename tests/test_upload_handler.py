@@ -0,0 +1,239 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from lib.server.local_server import LocalServer
+from lib.server.upload_handler import UploadError, UploadHandler
+from tests.support.synthetic import create_model, create_results
+
+
+@pytest.fixture
+def server():
+    server = LocalServer(UploadHandler.get_app_password()).start()
+    yield server
+    server.stop()
+
+
+def get_database(model):
+    return {section: {entity["id"]: entity for entity in entities}
+            for section, entities in json.loads("{" + model.get_json_database() + "}").items()}
+
+
+def play(model, fraction):
+    return model.apply_new_game_results(create_results(model, fraction))
+
+
+def test_delta_after_full_upload(server, tmp_path):
+    model = create_model()
+    handler = UploadHandler(str(tmp_path), server.url, delta_uploads=True)
+
+    handler.upload_database(model)
+    play(model, 0.5)
+    handler.upload_database(model)
+
+    assert server.uploads == ["database", "database_delta"]
+    assert server.database == get_database(model)
+
+
+def test_forced_full_upload_resets_delta_state(server, tmp_path):
+    model = create_model()
+    UploadHandler(str(tmp_path), server.url, delta_uploads=True).upload_database(model)
+
+    # another database is uploaded in full, as upload_model does
+    other_model = create_model()
+    play(other_model, 0.5)
+    UploadHandler(str(tmp_path), server.url).upload_json_database(other_model.get_json_database(), force=True)
+
+    play(model, 0.2)
+    UploadHandler(str(tmp_path), server.url, delta_uploads=True).upload_database(model)
+
+    assert server.uploads == ["database", "database", "database"]
+    assert server.database == get_database(model)
+
+
+def test_full_upload_of_fragments_matches_the_json_database(server, tmp_path):
+    model = create_model()
+    play(model, 0.5)
+    UploadHandler(str(tmp_path), server.url).upload_json_database(model.get_json_database())
+
+    # the same database, now joined from its fragments, is already on the server
+    UploadHandler(str(tmp_path), server.url, delta_uploads=True).upload_database(model)
+    UploadHandler(str(tmp_path), server.url).upload_database(model)
+
+    assert server.uploads == ["database"]
+    assert server.database == get_database(model)
+
+
+def test_rejected_delta_falls_back_to_full_upload(server, tmp_path):
+    model = create_model()
+    handler = UploadHandler(str(tmp_path), server.url, delta_uploads=True)
+    handler.upload_database(model)
+
+    # the server lost its database and rejects the delta
+    server.database = None
+    play(model, 0.5)
+    handler.upload_database(model)
+
+    assert server.uploads == ["database", "database_delta", "database"]
+    assert server.database == get_database(model)
+
+
+def test_failed_delta_is_not_retried_in_full(server, tmp_path):
+    model = create_model()
+    handler = UploadHandler(str(tmp_path), server.url, delta_uploads=True, retries=0)
+    handler.upload_database(model)
+
+    server.failures = 1
+    play(model, 0.5)
+    with pytest.raises(UploadError) as error:
+        handler.upload_database(model)
+
+    assert error.value.status_code == 503
+    assert server.failures == 0
+    assert server.uploads == ["database"]
+
+    handler.upload_database(model)
+    assert server.uploads == ["database", "database_delta"]
+    assert server.database == get_database(model)
+
+
+def test_unreachable_server_is_not_retried_in_full(server, tmp_path):
+    model = create_model()
+    handler = UploadHandler(str(tmp_path), server.url, delta_uploads=True, retries=0)
+    handler.upload_database(model)
+    server.stop()
+
+    play(model, 0.5)
+    with pytest.raises(requests.ConnectionError):
+        handler.upload_database(model)
+
+
+def read_metrics(folder):
+    with open(folder + "/upload_metrics.log") as metrics_file:
+        return [json.loads(line) for line in metrics_file]
+
+
+def upload_timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_retries_transient_errors_with_backoff(server, tmp_path, status):
+    handler = UploadHandler(str(tmp_path), server.url, retries=3, backoff=0.05)
+    server.failures = 2
+    server.failure_status = status
+
+    elapsed = upload_timed(lambda: handler.upload_message("Titel", "Bericht"))
+
+    assert elapsed >= 0.05 + 0.1
+    assert len(server.messages) == 1
+    metrics = read_metrics(str(tmp_path))
+    assert [(m["type"], m["attempts"], m["status"]) for m in metrics] == [("message", 3, 200)]
+
+
+def test_honours_retry_after(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, retries=1, backoff=0.01)
+    server.failures = 1
+    server.failure_status = 429
+    server.retry_after = 1
+
+    elapsed = upload_timed(lambda: handler.upload_message("Titel", "Bericht"))
+
+    assert elapsed >= 1
+    assert len(server.messages) == 1
+
+
+def test_gives_up_after_the_retries(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, retries=2, backoff=0.01)
+    server.failures = 10
+
+    with pytest.raises(UploadError) as error:
+        handler.upload_message("Titel", "Bericht")
+
+    assert error.value.status_code == 503
+    assert server.failures == 7
+    assert read_metrics(str(tmp_path))[0]["attempts"] == 3
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+def test_does_not_retry_client_errors(server, tmp_path, status):
+    handler = UploadHandler(str(tmp_path), server.url, retries=3, backoff=0.01)
+    server.failures = 5
+    server.failure_status = status
+
+    with pytest.raises(UploadError) as error:
+        handler.upload_message("Titel", "Bericht")
+
+    assert error.value.status_code == status
+    assert server.failures == 4
+
+
+def test_wrong_password_is_not_retried(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, retries=3, backoff=0.01)
+    handler.password = "wrong"
+
+    with pytest.raises(UploadError) as error:
+        handler.upload_message("Titel", "Bericht")
+
+    assert error.value.status_code == 403
+    assert read_metrics(str(tmp_path))[0]["attempts"] == 1
+
+
+def test_retries_timeouts(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, timeout=(1, 0.1), retries=1, backoff=0.01)
+    server.latency = 0.3
+
+    with pytest.raises(requests.Timeout):
+        handler.upload_message("Titel", "Bericht")
+
+    metrics = read_metrics(str(tmp_path))
+    assert (metrics[0]["attempts"], metrics[0]["status"]) == (2, "ReadTimeout")
+
+
+def test_timeout_then_success(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, timeout=(1, 0.2), retries=2, backoff=0.01)
+    server.latency = 0.5
+    # the latency is gone by the time of the second attempt
+    timer = threading.Timer(0.25, lambda: setattr(server, "latency", 0.0))
+    timer.start()
+
+    handler.upload_message("Titel", "Bericht")
+    timer.join()
+
+    assert read_metrics(str(tmp_path))[0]["status"] == 200
+    assert read_metrics(str(tmp_path))[0]["attempts"] >= 2
+
+
+def test_compressed_uploads(server, tmp_path):
+    model = create_model(10)
+    UploadHandler(str(tmp_path), server.url, compress=True).upload_database(model)
+
+    assert server.database == get_database(model)
+    metrics = read_metrics(str(tmp_path))
+    assert metrics[0]["encoded_size"] < metrics[0]["size"]
+
+
+def test_upload_concurrently_reports_every_failure(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url, retries=0)
+    server.failure_status = 400
+    server.failures = 1
+
+    errors = UploadHandler.upload_concurrently([lambda: handler.upload_message("Titel", "1")] +
+                                               [lambda: time.sleep(0.1) or handler.upload_message("Titel", "2")] * 3)
+
+    assert sum(1 for error in errors if error is not None) == 1
+    assert len(server.messages) == 3
+
+
+def test_concurrent_uploads_record_every_metric(server, tmp_path):
+    handler = UploadHandler(str(tmp_path), server.url)
+
+    errors = UploadHandler.upload_concurrently([lambda i=i: handler.upload_message("Titel", str(i)) for i in range(8)])
+
+    assert errors == [None] * 8
+    assert len(read_metrics(str(tmp_path))) == 8
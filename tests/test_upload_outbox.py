@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+
+import pytest
+
+from lib.server.local_server import LocalServer
+from lib.server.upload_handler import UploadHandler
+from lib.server.upload_outbox import UploadOutbox
+from tests.support.synthetic import create_model, create_results
+
+
+@pytest.fixture
+def server():
+    server = LocalServer(UploadHandler.get_app_password()).start()
+    yield server
+    server.stop()
+
+
+def create_outbox(folder, server, **options):
+    options.setdefault("results_window", 0)
+    return UploadOutbox(str(folder), server.url, start_worker=False, **options)
+
+
+def run_worker(outbox):
+    outbox.run(idle_timeout=0.1, poll_interval=0.01)
+
+
+def test_all_jobs_are_sent(server, tmp_path):
+    model = create_model()
+    outbox = create_outbox(tmp_path, server)
+
+    changes = model.apply_new_game_results(create_results(model, 0.5))
+    outbox.upload_results(changes.new_results)
+    outbox.upload_database(model)
+    outbox.upload_message("Titel", "Bericht")
+    run_worker(outbox)
+
+    # the message may go along with either, but the results always come before the database
+    assert sorted(server.uploads) == ["database", "message", "results"]
+    assert [kind for kind in server.uploads if kind != "message"] == ["results", "database"]
+    assert set(server.results) == set(changes.new_results)
+    assert outbox.get_pending_jobs() == []
+    assert outbox.get_problems() is None
+
+
+def test_results_are_merged_and_databases_superseded(server, tmp_path):
+    model = create_model()
+    outbox = create_outbox(tmp_path, server)
+    results = create_results(model, 1.0)
+    names = sorted(results)
+
+    all_new_results = {}
+    for count in (5, 10):
+        changes = model.apply_new_game_results({name: results[name] for name in names[:count]})
+        outbox.upload_results(changes.new_results)
+        all_new_results.update(changes.new_results)
+    outbox.upload_database(model, force=True)
+    outbox.upload_database(model)
+    assert len(outbox.get_pending_jobs()) == 2
+
+    run_worker(outbox)
+
+    assert server.uploads == ["results", "database"]
+    assert set(server.results) == set(all_new_results)
+
+
+def test_results_are_sent_before_the_next_database(server, tmp_path, monkeypatch):
+    model = create_model()
+    outbox = create_outbox(tmp_path, server)
+    upload_results = UploadHandler.upload_results
+    # slow results would be overtaken by a database sent at the same time
+    monkeypatch.setattr(UploadHandler, "upload_results",
+                        lambda self, results: time.sleep(0.1) or upload_results(self, results))
+
+    for fraction in (0.25, 0.5):
+        changes = model.apply_new_game_results(create_results(model, fraction))
+        outbox.upload_results(changes.new_results)
+        outbox.upload_database(model, force=True)
+        run_worker(outbox)
+
+    assert server.uploads == ["results", "database", "results", "database"]
+
+
+def test_job_queued_while_the_worker_stops_is_sent(server, tmp_path, monkeypatch):
+    outbox = create_outbox(tmp_path, server)
+    release_lock = UploadOutbox._UploadOutbox__release_lock
+    queued = []
+
+    def release_lock_after_queueing(self):
+        # another macro queues a job while the lock is still held, so it does not start a worker
+        if not queued:
+            queued.append(True)
+            create_outbox(tmp_path, server).upload_message("Titel", "Laat")
+        release_lock(self)
+
+    monkeypatch.setattr(UploadOutbox, "_UploadOutbox__release_lock", release_lock_after_queueing)
+    run_worker(outbox)
+
+    assert server.uploads == ["message"]
+    assert outbox.get_pending_jobs() == []
+
+
+def test_worker_reuses_its_connection(server, tmp_path):
+    outbox = create_outbox(tmp_path, server)
+    for i in range(6):
+        outbox.upload_message("Titel", str(i))
+
+    run_worker(outbox)
+
+    assert server.uploads == ["message"] * 6
+    assert server.connections == 1
+    assert UploadHandler._UploadHandler__sessions == {}
+
+
+def abandon_lock(folder):
+    lock_file_name = os.path.join(str(folder), "outbox", "worker.lock")
+    os.makedirs(os.path.dirname(lock_file_name), exist_ok=True)
+    with open(lock_file_name, "w") as lock_file:
+        lock_file.write("1 1")
+    os.utime(lock_file_name, (time.time() - 60, time.time() - 60))
+    return lock_file_name
+
+
+def test_abandoned_lock_is_taken_over(server, tmp_path):
+    outbox = create_outbox(tmp_path, server)
+    lock_file_name = abandon_lock(tmp_path)
+
+    outbox.upload_message("Titel", "Bericht")
+    run_worker(outbox)
+
+    assert server.uploads == ["message"]
+    assert not os.path.exists(lock_file_name)
+
+
+def test_lock_taken_over_first_by_another_worker_is_kept(server, tmp_path, monkeypatch):
+    lock_file_name = abandon_lock(tmp_path)
+    first_worker, second_worker = create_outbox(tmp_path, server), create_outbox(tmp_path, server)
+    get_abandoned_lock = UploadOutbox._UploadOutbox__get_abandoned_lock
+    taken_over = []
+
+    def get_abandoned_lock_and_fall_behind(self):
+        # the second worker saw the abandoned lock, but the first one takes it over before it does
+        abandoned_lock_content = get_abandoned_lock(self)
+        if self is second_worker and not taken_over:
+            taken_over.append(first_worker._UploadOutbox__acquire_lock())
+        return abandoned_lock_content
+
+    monkeypatch.setattr(UploadOutbox, "_UploadOutbox__get_abandoned_lock", get_abandoned_lock_and_fall_behind)
+
+    assert not second_worker._UploadOutbox__acquire_lock()
+    assert taken_over == [True]
+    with open(lock_file_name, "r") as lock_file:
+        assert lock_file.read() == first_worker._UploadOutbox__lock_content
+    assert os.listdir(os.path.dirname(lock_file_name)) == ["worker.lock"]
+
+
+def test_failing_job_is_set_aside_and_reported(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(UploadOutbox, "_UploadOutbox__max_attempts", 1)
+    outbox = create_outbox(tmp_path, server)
+    server.failure_status = 400
+    server.failures = 1
+
+    outbox.upload_message("Titel", "Afgewezen")
+    outbox.upload_message("Titel", "Bericht")
+    run_worker(outbox)
+
+    assert [message["message"] for message in server.messages] == ["Bericht"]
+    assert len(os.listdir(os.path.join(str(tmp_path), "outbox", "failed"))) == 1
+    assert "set aside" in outbox.get_problems()
+
+
+def test_overdue_jobs_are_reported(server, tmp_path, monkeypatch):
+    outbox = create_outbox(tmp_path, server)
+    outbox.upload_message("Titel", "Bericht")
+    assert outbox.get_problems() is None
+
+    monkeypatch.setattr(UploadOutbox, "_UploadOutbox__overdue_job_age", 0)
+    assert "waiting" in outbox.get_problems()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+    return time.time()
+
+
+def test_results_window_starts_at_the_last_send(server, tmp_path):
+    model = create_model()
+    outbox = create_outbox(tmp_path, server, results_window=0.5)
+    results = create_results(model, 1.0)
+    names = sorted(results)
+
+    worker = threading.Thread(target=outbox.run, kwargs={"idle_timeout": 1.0, "poll_interval": 0.01})
+    worker.start()
+    try:
+        # a single result after a quiet spell goes out at once
+        start = time.time()
+        changes = model.apply_new_game_results({name: results[name] for name in names[:1]})
+        outbox.upload_results(changes.new_results)
+        first_sent = wait_for(lambda: len(server.uploads) == 1)
+        assert first_sent - start < 0.4
+
+        # results that follow quickly are merged and held back until the window has passed
+        for count in (2, 3):
+            changes = model.apply_new_game_results({name: results[name] for name in names[:count]})
+            outbox.upload_results(changes.new_results)
+        second_sent = wait_for(lambda: len(server.uploads) == 2)
+        assert second_sent - first_sent >= 0.45
+    finally:
+        worker.join()
+
+    assert server.uploads == ["results", "results"]
+    assert len(server.results) == 3